@@ -0,0 +1,317 @@
+"""Offline end-to-end benchmark of the crawler, full crew runs and the web server.
+
+A fixture website, a fake Serper API and a fake Gemini client (see ``fakes.py``)
+stand in for the internet, so runs are repeatable and cost nothing:
+
+- ``crawl`` runs ``CrawlWebsiteTool`` on static, slow and JavaScript-only sites
+  (pages/sec, crawl and per-page time, pages by tier and status).
+- ``crew`` runs ``CompetitorResearchCrew`` for one company at a time
+  (per-task latency, LLM calls, tool time).
+- ``server`` sends jobs to the FastAPI app all at once and waits for them
+  (jobs/minute, job latency, time spent in each stage).
+
+Peak RSS is recorded after each scenario. Everything runs in a temporary
+directory, so caches start cold and the repository's ``output/`` is untouched.
+The results are printed as JSON; ``--compare`` shows how every number changed
+against an earlier run.
+
+    python benchmarks/end_to_end.py -o before.json
+    python benchmarks/end_to_end.py --compare before.json
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from fakes import VARIANTS, FakeGenaiClient, FakeSerper, FixtureSite
+
+SCENARIOS = ("crawl", "crew", "server")
+REPO = Path(__file__).resolve().parent.parent
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {"p50": round(pick(0.5), 3), "p95": round(pick(0.95), 3),
+            "mean": round(sum(ordered) / len(ordered), 3), "max": round(ordered[-1], 3)}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def configure(workdir: Path, serper: FakeSerper, args):
+    """Point the app at the fakes; must run before ``my_first_crew`` is imported."""
+    os.chdir(workdir)
+    os.environ.update({
+        "GEMINI_API_KEY": "benchmark",
+        "MODEL": "gemini-2.5-flash",
+        "GEMINI_CACHE_MODE": "off",
+        "SERPER_API_KEY": "benchmark",
+        "SERPER_BASE_URL": serper.url,
+        "GEMINI_RPM": "0",
+        "GEMINI_TPM": "0",
+        "SERPER_RPM": "0",
+        "CACHE_DIR": str(workdir / ".cache"),
+        "JOB_STORE": "sqlite",
+        "JOB_DB": str(workdir / "jobs.sqlite"),
+        "JOB_RUNNER": "local",
+        "SERVER_WORKERS": str(args.concurrency),
+        "SERVER_MAX_QUEUE": str(args.jobs),
+        "CREW_INCREMENTAL": "false",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+        # CrewAI otherwise waits 20s on stdin for a "view traces?" answer in every new directory
+        "CREWAI_TESTING": "true",
+    })
+
+
+def bench_crawl(site: FixtureSite, args) -> dict:
+    from my_first_crew.metrics import METRICS, tagged
+    from my_first_crew.tools.custom_tool import CrawlWebsiteTool
+
+    results = {}
+    for variant in args.variants:
+        before = dict(METRICS.pages.values)
+        requests_before = site.requests
+        seconds, errors = [], []
+        pages, page_seconds, chars = 0, 0.0, 0
+        for i in range(args.crawls):
+            job_id = f"crawl-{variant}-{i}"
+            started = time.perf_counter()
+            try:
+                with tagged(job_id=job_id):
+                    chars += len(CrawlWebsiteTool(use_cache=False)._run(site.site_url(f"crawl{i}", variant)))
+            except Exception as exc:
+                errors.append(f"{type(exc).__name__}: {(str(exc).splitlines() or [''])[0]}")
+            seconds.append(time.perf_counter() - started)
+            summary = METRICS.job_summary(job_id) or {}
+            pages += summary.get("pages", 0)
+            page_seconds += summary.get("crawl_seconds", 0.0)
+
+        outcomes = {}
+        for key, value in METRICS.pages.values.items():
+            if value - before.get(key, 0):
+                labels = dict(key)
+                outcome = f"{labels.get('tier') or 'none'}/{labels.get('status')}"
+                outcomes[outcome] = outcomes.get(outcome, 0) + int(value - before.get(key, 0))
+        results[variant] = {
+            "crawls": args.crawls,
+            "pages": pages,
+            "http_requests": site.requests - requests_before,
+            "pages_per_sec": round(pages / sum(seconds), 2) if sum(seconds) else 0.0,
+            "crawl_seconds": summarize(seconds),
+            "page_seconds_mean": round(page_seconds / pages, 4) if pages else None,
+            "output_chars_mean": chars // max(1, args.crawls),
+            "pages_by_outcome": outcomes,
+            "errors": errors[:3],
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    return results
+
+
+def bench_crew(args) -> dict:
+    from my_first_crew.main import run_company
+
+    records = [run_company(f"CrewBench{i}") for i in range(args.crews)]
+    tasks: Dict[str, List[float]] = {}
+    for record in records:
+        for name, seconds in record["tasks"].items():
+            tasks.setdefault(name, []).append(seconds)
+    metrics = [r["metrics"] or {} for r in records]
+    tools: Dict[str, List[float]] = {}
+    for m in metrics:
+        for name, stats in m.get("tools", {}).items():
+            tools.setdefault(name, []).append(stats["seconds"])
+    return {
+        "runs": len(records),
+        "failed": [r.get("error") for r in records if r["status"] != "ok"],
+        "seconds": summarize([r["seconds"] for r in records]),
+        "tasks": {name: summarize(values) for name, values in tasks.items()},
+        "tools": {name: summarize(values) for name, values in tools.items()},
+        "llm_calls_mean": round(sum(m.get("llm_calls", 0) for m in metrics) / len(records), 1),
+        "llm_seconds_mean": round(sum(m.get("llm_seconds", 0.0) for m in metrics) / len(records), 3),
+        "pages_mean": round(sum(m.get("pages", 0) for m in metrics) / len(records), 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_server(args) -> dict:
+    from fastapi.testclient import TestClient
+    from my_first_crew.job_store import TERMINAL_STAGES
+    from my_first_crew.server import app
+
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        submitted, rejected = {}, 0
+        for i in range(args.jobs):
+            response = client.post("/api/start", json={"company": f"ServerBench{i}"})
+            if response.status_code == 200:
+                submitted[response.json()["job_id"]] = time.perf_counter()
+            else:
+                rejected += 1
+
+        finished: Dict[str, dict] = {}
+        latencies = []
+        while len(finished) < len(submitted) and time.perf_counter() - started < args.timeout:
+            for job_id in submitted.keys() - finished.keys():
+                status = client.get(f"/api/status/{job_id}").json()
+                if status["stage"] in TERMINAL_STAGES:
+                    finished[job_id] = status
+                    latencies.append(time.perf_counter() - submitted[job_id])
+            time.sleep(0.05)
+        wall = time.perf_counter() - started
+
+        stages: Dict[str, List[float]] = {}
+        for job_id in finished:
+            history = client.get(f"/api/status/{job_id}/history").json()
+            for entry, following in zip(history, history[1:]):
+                stages.setdefault(entry["stage"], []).append(following["at"] - entry["at"])
+
+    done = [s for s in finished.values() if s["stage"] == "done"]
+    outcomes: Dict[str, int] = {}
+    for status in finished.values():
+        outcomes[status["stage"]] = outcomes.get(status["stage"], 0) + 1
+    return {
+        "jobs": args.jobs,
+        "concurrency": args.concurrency,
+        "rejected": rejected,
+        "unfinished": len(submitted) - len(finished),
+        "outcomes": outcomes,
+        "wall_seconds": round(wall, 3),
+        "jobs_per_minute": round(len(done) / wall * 60, 2) if wall else 0.0,
+        "job_seconds": summarize(latencies),
+        "stage_seconds": {stage: summarize(values) for stage, values in stages.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def flatten(data, prefix: str = "") -> Dict[str, float]:
+    numbers = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            numbers.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            numbers[path] = value
+    return numbers
+
+
+def compare(old: dict, new: dict):
+    before = flatten({k: v for k, v in old.items() if k != "meta"})
+    after = flatten({k: v for k, v in new.items() if k != "meta"})
+    print(f"\nvs {old.get('meta', {}).get('commit', '?')} -> {new['meta']['commit']}")
+    print(f"{'metric':<52} {'before':>10} {'after':>10} {'change':>8}")
+    for path in sorted(before.keys() & after.keys()):
+        a, b = before[path], after[path]
+        change = f"{(b - a) / a * 100:+.1f}%" if a else ""
+        print(f"{path:<52} {a:>10g} {b:>10g} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated: crawl,crew,server")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="fixture sites to crawl: static,slow,js")
+    parser.add_argument("--pages", type=int, default=40, help="pages on each fixture site")
+    parser.add_argument("--slow-delay", type=float, default=0.3, help="seconds the slow site waits per page")
+    parser.add_argument("--crawls", type=int, default=3, help="crawls per site variant")
+    parser.add_argument("--crews", type=int, default=2, help="crew runs, one after another")
+    parser.add_argument("--jobs", type=int, default=8, help="jobs sent to the server")
+    parser.add_argument("--concurrency", type=int, default=4, help="server worker threads (SERVER_WORKERS)")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds to wait for server jobs")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per fake Gemini call")
+    parser.add_argument("--serper-latency", type=float, default=0.05, help="seconds per fake Serper request")
+    parser.add_argument("--report-kb", type=int, default=8, help="size of the fake final report")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="earlier results to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the crew's console output")
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    args.variants = [v for v in args.variants.split(",") if v]
+    for name, allowed in (("scenarios", SCENARIOS), ("variants", VARIANTS)):
+        unknown = set(getattr(args, name)) - set(allowed)
+        if unknown:
+            parser.error(f"unknown {name}: {', '.join(sorted(unknown))}")
+    output = Path(args.output).resolve() if args.output else None
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+
+    workdir = Path(tempfile.mkdtemp(prefix="crew-bench-"))
+    site = FixtureSite(pages=args.pages, slow_delay=args.slow_delay).start()
+    serper = FakeSerper(site, latency=args.serper_latency).start()
+    configure(workdir, serper, args)
+
+    from my_first_crew.crew import gemini_llm
+    from my_first_crew.metrics import install_crewai_listeners
+
+    install_crewai_listeners()
+
+    fake = FakeGenaiClient(site, latency=args.llm_latency, report_kb=args.report_kb)
+    gemini_llm.client = fake
+
+    results = {"meta": {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "verbose")},
+    }}
+    quiet = contextlib.nullcontext()
+    if not args.verbose:
+        logging.disable(logging.INFO)
+        quiet = contextlib.redirect_stdout(open(os.devnull, "w"))
+    try:
+        with quiet:
+            for scenario in args.scenarios:
+                print(f"⏱️ {scenario}…", file=sys.stderr)
+                started = time.perf_counter()
+                if scenario == "crawl":
+                    results["crawl"] = bench_crawl(site, args)
+                elif scenario == "crew":
+                    results["crew"] = bench_crew(args)
+                else:
+                    results["server"] = bench_server(args)
+                print(f"   done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    finally:
+        serper.stop()
+        site.stop()
+        os.chdir(REPO)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results["totals"] = {"llm_calls": fake.stats["llm_calls"], "site_requests": site.requests,
+                         "serper_requests": serper.requests, "peak_rss_mb": peak_rss_mb()}
+    text = json.dumps(results, indent=2)
+    print(text)
+    if output:
+        output.write_text(text + "\n", encoding="utf-8")
+    if baseline:
+        compare(baseline, results)
+
+
+if __name__ == "__main__":
+    main()
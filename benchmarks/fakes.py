@@ -0,0 +1,338 @@
+"""Local stand-ins for the web, Serper and Gemini, used by ``end_to_end.py``.
+
+Nothing here talks to the internet:
+
+- ``FixtureSite`` serves generated company websites over HTTP in three variants:
+  ``static`` (server-rendered), ``slow`` (each response delayed) and ``js``
+  (an empty app shell that only renders in a browser).
+- ``FakeSerper`` answers the Serper ``/search`` and ``/news`` endpoints with
+  results pointing at the fixture site.
+- ``FakeGenaiClient`` replaces ``genai.Client`` and plays a scripted ReAct run:
+  each agent calls its tools in a fixed order, then gives a final answer.
+"""
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from google.genai import types
+
+VARIANTS = ("static", "slow", "js")
+TOPICS = ("product", "service", "pricing", "platform", "release", "customer", "partner", "security")
+
+
+def make_words(count: int = 600, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ven", "tor", "sa", "qui", "ber", "dan", "el", "fo", "gri", "nu", "pex", "ral", "zo"]
+    return ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(count)]
+
+
+WORDS = make_words()
+
+
+def paragraph(rng: random.Random, sentences: int = 4) -> str:
+    """A few sentences of filler; every call differs, so pages never look like duplicates."""
+    out = []
+    for _ in range(sentences):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(10, 18))]
+        words.insert(rng.randrange(len(words)), rng.choice(TOPICS))
+        out.append(" ".join(words).capitalize() + ".")
+    return " ".join(out)
+
+
+class LocalServer(ABC):
+    """A threaded HTTP server on 127.0.0.1 and a free port, run in a daemon thread."""
+
+    def __init__(self):
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def handle(self, handler: BaseHTTPRequestHandler):
+        """Answer one request."""
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self) -> "LocalServer":
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                owner.count()
+                owner.handle(self)
+
+            do_POST = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def send(handler: BaseHTTPRequestHandler, status: int, body: bytes, content_type: str):
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+class FixtureSite(LocalServer):
+    """Company websites at ``/{variant}/{site}/`` with pages at ``/{variant}/{site}/page/{n}``.
+
+    Any ``site`` name works and yields its own text, so every crawl can start
+    cold. The landing page links to the first ``landing_links`` pages and each
+    page links to the next three, so deeper crawls keep finding new pages.
+    """
+
+    def __init__(self, pages: int = 40, landing_links: int = 12, slow_delay: float = 0.5):
+        super().__init__()
+        self.pages = pages
+        self.landing_links = landing_links
+        self.slow_delay = slow_delay
+
+    def site_url(self, site: str, variant: str = "static") -> str:
+        return f"{self.url}/{variant}/{site}/"
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        parts = handler.path.split("?")[0].strip("/").split("/")
+        if len(parts) not in (2, 4) or parts[0] not in VARIANTS or (len(parts) == 4 and parts[2] != "page"):
+            return self.send(handler, 404, b"not found", "text/plain")
+        variant, site = parts[0], parts[1]
+        number = int(parts[3]) if len(parts) == 4 and parts[3].isdigit() else None
+        if len(parts) == 4 and (number is None or number >= self.pages):
+            return self.send(handler, 404, b"not found", "text/plain")
+        if variant == "slow":
+            time.sleep(self.slow_delay)
+        body = self.render(variant, site, number)
+        self.send(handler, 200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+    def render(self, variant: str, site: str, number: Optional[int]) -> str:
+        rng = random.Random(f"{site}/{number}")
+        base = f"/{variant}/{site}"
+        if number is None:
+            title = f"{site} – products and services"
+            linked = range(min(self.landing_links, self.pages))
+        else:
+            title = f"{site} {TOPICS[number % len(TOPICS)]} {number}"
+            linked = [(number + k) % self.pages for k in (1, 2, 3)]
+        links = "".join(f'<li><a href="{base}/page/{n}">{site} {TOPICS[n % len(TOPICS)]} {n}</a></li>' for n in linked)
+        content = f"<h1>{title}</h1>" + "".join(f"<p>{paragraph(rng)}</p>" for _ in range(6)) + f"<ul>{links}</ul>"
+        chrome = f'<header><nav><a href="{base}/">Home</a></nav></header>'
+        if variant == "js":
+            script = f"document.getElementById('root').innerHTML = {json.dumps(content)};"
+            body = f'{chrome}<div id="root"></div><script>{script}</script>'
+        else:
+            body = f"{chrome}<main>{content}</main><footer>© {site}</footer>"
+        return f"<!doctype html><html><head><title>{title}</title></head><body>{body}</body></html>"
+
+
+class FakeSerper(LocalServer):
+    """The Serper search API, returning results on ``site`` after an optional ``latency``."""
+
+    def __init__(self, site: FixtureSite, latency: float = 0.0):
+        super().__init__()
+        self.site = site
+        self.latency = latency
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        length = int(handler.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(handler.rfile.read(length) or b"{}")
+        except ValueError:
+            payload = {}
+        endpoint = handler.path.strip("/")
+        if endpoint not in ("search", "news"):
+            return self.send(handler, 404, b"{}", "application/json")
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps(self.results(endpoint, payload.get("q", ""), int(payload.get("num", 10))))
+        self.send(handler, 200, body.encode("utf-8"), "application/json")
+
+    def results(self, endpoint: str, query: str, num: int) -> dict:
+        rng = random.Random(query)
+        site = "".join(c for c in query.split(" ")[0].lower() if c.isalnum()) or "company"
+        items = []
+        for position in range(1, num + 1):
+            page = rng.randrange(self.site.pages)
+            items.append({
+                "title": f"{query} – result {position}",
+                "link": f"{self.site.url}/static/{site}/page/{page}",
+                "snippet": paragraph(rng, 2),
+                "position": position,
+                "date": f"2026-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+                "source": f"{site} news",
+            })
+        if endpoint == "news":
+            return {"searchParameters": {"q": query, "type": "news"}, "news": items, "credits": 1}
+        return {
+            "searchParameters": {"q": query, "type": "search"},
+            "organic": items,
+            "peopleAlsoAsk": [{"question": f"What is {query}?", "snippet": paragraph(rng, 1), "title": query,
+                               "link": items[0]["link"]}],
+            "credits": 1,
+        }
+
+
+class FakeModels:
+    """``client.models`` of the fake Gemini client.
+
+    The agent is recognised by the tools in the request: the crawler searches and
+    then crawls a fresh fixture site, the news agent runs one batch search, and
+    an agent without tools (the summarizer) writes a ``report_kb`` report. The
+    next step is picked by counting the tool calls already in the transcript
+    (not their results: plain-text observations such as crawl output are not
+    sent back as function responses). Each call waits ``latency`` seconds, and streamed answers arrive
+    in ``chunk_chars`` pieces ``chunk_delay`` seconds apart.
+    """
+
+    def __init__(self, site: FixtureSite, latency: float = 0.2, chunk_chars: int = 400,
+                 chunk_delay: float = 0.005, report_kb: int = 8):
+        self.site = site
+        self.latency = latency
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        self.report_kb = report_kb
+        self.calls = 0
+        self._runs = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_run(self) -> int:
+        with self._lock:
+            return next(self._runs)
+
+    def script(self, tools: List[str], step: int) -> Optional[types.FunctionCall]:
+        # Fresh names for every search and site, so no two calls share a cache entry
+        if "fast_web_crawler" in tools:
+            if step == 0:
+                return types.FunctionCall(name="FlexibleSerperDevTool",
+                                          args={"search_query": f"bench{self.next_run()} products page"})
+            if step == 1:
+                return types.FunctionCall(name="fast_web_crawler",
+                                          args={"url": self.site.site_url(f"bench{self.next_run()}")})
+        elif "BatchSerperDevTool" in tools and step == 0:
+            run = self.next_run()
+            topics = ("mission and vision", "financial performance", "partnerships", "controversies and lawsuits")
+            return types.FunctionCall(name="BatchSerperDevTool",
+                                      args={"search_queries": [f"bench{run} {t}" for t in topics]})
+        return None
+
+    def answer(self, tools: List[str], seed: int) -> str:
+        rng = random.Random(seed)
+        if tools:
+            return "## Findings\n\n" + "\n\n".join(paragraph(rng) for _ in range(3))
+        sections = []
+        while sum(len(s) for s in sections) < self.report_kb * 1024:
+            sections.append(f"## {rng.choice(TOPICS).capitalize()}\n\n{paragraph(rng, 6)}")
+        return "# Competitor report\n\n" + "\n\n".join(sections)
+
+    def respond(self, contents: List[types.Content], config: Optional[types.GenerateContentConfig]) -> List[types.Part]:
+        tools = [d.name for t in (getattr(config, "tools", None) or []) for d in (t.function_declarations or [])]
+        step = sum(1 for c in contents for p in (c.parts or []) if p.function_call)
+        with self._lock:
+            self.calls += 1
+            seed = self.calls
+        call = self.script(tools, step)
+        thought = types.Part(text=f"Step {step + 1} of the scripted run.", thought=True)
+        if call is not None:
+            return [thought, types.Part(function_call=call)]
+        return [thought, types.Part(text=self.answer(tools, seed))]
+
+    @staticmethod
+    def usage(contents: List[types.Content], parts: List[types.Part]) -> types.GenerateContentResponseUsageMetadata:
+        prompt = sum(len(p.text or "") + len(json.dumps(p.function_response.response if p.function_response else {}))
+                     for c in contents for p in (c.parts or []))
+        output = sum(len(p.text or "") for p in parts if not p.thought)
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt // 4, candidates_token_count=output // 4 + 1, thoughts_token_count=8)
+
+    @staticmethod
+    def response(parts: List[types.Part], usage=None) -> types.GenerateContentResponse:
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=parts), finish_reason="STOP")],
+            usage_metadata=usage,
+        )
+
+    def chunks(self, parts: List[types.Part]) -> List[List[types.Part]]:
+        pieces = []
+        for part in parts:
+            if part.text and not part.thought:
+                text = part.text
+                pieces += [[types.Part(text=text[i:i + self.chunk_chars])] for i in range(0, len(text), self.chunk_chars)]
+            else:
+                pieces.append([part])
+        return pieces
+
+    def generate_content(self, model: str, contents: List[types.Content], config=None):
+        parts = self.respond(contents, config)
+        time.sleep(self.latency + self.chunk_delay * (len(self.chunks(parts)) - 1))
+        return self.response(parts, self.usage(contents, parts))
+
+    def generate_content_stream(self, model: str, contents: List[types.Content], config=None):
+        parts = self.respond(contents, config)
+        usage = self.usage(contents, parts)
+        time.sleep(self.latency)
+        pieces = self.chunks(parts)
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield self.response(piece, usage if i == len(pieces) - 1 else None)
+
+
+class FakeAsyncModels:
+    """``client.aio.models``: the same script, awaiting instead of sleeping."""
+
+    def __init__(self, models: FakeModels):
+        self.models = models
+
+    async def generate_content(self, model: str, contents: List[types.Content], config=None):
+        return await asyncio.to_thread(self.models.generate_content, model, contents, config)
+
+    async def generate_content_stream(self, model: str, contents: List[types.Content], config=None):
+        chunks = await asyncio.to_thread(lambda: list(self.models.generate_content_stream(model, contents, config)))
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        return stream()
+
+
+class FakeGenaiClient:
+    """Drop-in for ``genai.Client``: assign it to ``Gemini.client``."""
+
+    def __init__(self, site: FixtureSite, **options):
+        self.models = FakeModels(site, **options)
+        self.aio = SimpleNamespace(models=FakeAsyncModels(self.models))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"llm_calls": self.models.calls}
@@ -0,0 +1,72 @@
+"""Per-turn overhead of turning a growing ReAct transcript into a Gemini request.
+
+Simulates a conversation where every turn appends a tool call with a large
+crawl-sized observation, then times ``Gemini._prepare`` (tool extraction,
+message conversion and config) on each turn. ``warm`` reuses one instance, as a
+crew does; ``cold`` uses a fresh instance per turn, i.e. no memoization.
+
+    python benchmarks/llm_conversion.py --turns 40 --observation-kb 40
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ["GEMINI_CACHE_MODE"] = "off"
+
+from my_first_crew.custom_llm import Gemini  # noqa: E402
+
+SYSTEM = (
+    "You are a research analyst.\n"
+    "Tool Name: fast_web_crawler\n"
+    "Tool Arguments: {'url': {'description': 'Website to crawl', 'type': 'str'}}\n"
+    "Tool Description: Crawl a website\n"
+    "Tool Name: BatchSerperDevTool\n"
+    "Tool Arguments: {'search_queries': {'description': 'Queries', 'type': 'list[str]'}}\n"
+    "Tool Description: Run several searches\n\n"
+    "Use the format Thought: / Action: / Action Input: / Observation:"
+)
+
+
+def turn_message(i: int, observation_kb: int) -> dict:
+    words = " ".join(f"word{j}" for j in range(observation_kb * 1024 // 8))
+    observation = json.dumps({"page": i, "text": words})
+    return {
+        "role": "assistant",
+        "content": (
+            f"Thought: look at page {i}\nAction: fast_web_crawler\n"
+            f'Action Input: {{"url": "https://example.com/{i}"}}\nObservation: {observation}'
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--observation-kb", type=int, default=40)
+    args = parser.parse_args()
+
+    messages = [{"role": "system", "content": SYSTEM}, {"role": "user", "content": "Research Acme"}]
+    warm = Gemini(model="gemini-2.5-flash", api_key="benchmark")
+    rows = []
+    for turn in range(1, args.turns + 1):
+        messages.append(turn_message(turn, args.observation_kb))
+
+        started = time.perf_counter()
+        warm._prepare(messages, None, None)
+        warm_ms = (time.perf_counter() - started) * 1000
+
+        cold = Gemini(model="gemini-2.5-flash", api_key="benchmark")
+        started = time.perf_counter()
+        cold._prepare(messages, None, None)
+        cold_ms = (time.perf_counter() - started) * 1000
+        rows.append({"turn": turn, "warm_ms": round(warm_ms, 3), "cold_ms": round(cold_ms, 3)})
+
+    print(f"{'turn':>5} {'warm ms':>10} {'cold ms':>10}")
+    for row in rows:
+        print(f"{row['turn']:>5} {row['warm_ms']:>10.3f} {row['cold_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
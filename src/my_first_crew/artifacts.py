@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Union
+
+try:
+    import brotli
+except ImportError:  # optional: reports are then served gzip-encoded only
+    brotli = None
+
+ARTIFACT_DIR = Path(os.getenv("ARTIFACT_DIR", str(Path("output") / "artifacts")))
+
+# Content-Encoding -> file suffix of the precompressed copy
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class Artifact:
+    """One stored version of a report."""
+    sha256: str
+    company: str
+    file: str  # the report's file name in output/
+    size: int
+    created_at: float
+    job_id: Optional[str] = None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.sha256}"'
+
+    def to_dict(self) -> dict:
+        return {"sha256": self.sha256, "company": self.company, "file": self.file, "size": self.size,
+                "created_at": self.created_at, "job_id": self.job_id}
+
+
+class ArtifactStore:
+    """Report versions kept by content hash, with precompressed copies and a per-company index.
+
+    Blobs live under ``blobs/ab/abcdef…`` next to ``.gz`` (and ``.br`` when the
+    ``brotli`` package is installed) copies made once at write time, so serving
+    never compresses. Identical content is stored once; ``put`` only adds a
+    version when a company's report actually changed.
+    """
+
+    def __init__(self, root: Path = ARTIFACT_DIR):
+        self.root = Path(root)
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False, timeout=30,
+                                   isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS versions ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, sha256 TEXT NOT NULL, company TEXT NOT NULL,"
+            " file TEXT NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, job_id TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS versions_company ON versions (company, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS versions_file ON versions (file, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS versions_sha ON versions (sha256)")
+
+    def blob_path(self, sha256: str, encoding: Optional[str] = None) -> Path:
+        return self.root / "blobs" / sha256[:2] / (sha256 + ENCODINGS.get(encoding, ""))
+
+    def encodings(self) -> List[str]:
+        """Content-Encodings available for every blob, preferred first."""
+        return [e for e in ENCODINGS if e != "br" or brotli is not None]
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _write_blob(self, sha256: str, data: bytes):
+        path = self.blob_path(sha256)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Compressed copies first, so a visible blob always has them
+        self._write(self.blob_path(sha256, "gzip"), gzip.compress(data, 9, mtime=0))
+        if brotli is not None:
+            self._write(self.blob_path(sha256, "br"), brotli.compress(data, quality=11))
+        self._write(path, data)
+
+    def put(self, company: str, source: Union[Path, bytes], file: Optional[str] = None,
+            job_id: Optional[str] = None) -> Artifact:
+        """Store a report (a path or its bytes) and return its version."""
+        if isinstance(source, Path):
+            file = file or source.name
+            data = source.read_bytes()
+        else:
+            data = source
+        sha256 = hashlib.sha256(data).hexdigest()
+        self._write_blob(sha256, data)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT * FROM versions WHERE company = ? ORDER BY id DESC LIMIT 1", (company,)
+                ).fetchone()
+                if row is None or row["sha256"] != sha256 or row["file"] != file:
+                    self._db.execute(
+                        "INSERT INTO versions (sha256, company, file, size, created_at, job_id) VALUES (?, ?, ?, ?, ?, ?)",
+                        (sha256, company, file, len(data), time.time(), job_id),
+                    )
+                    row = self._db.execute("SELECT * FROM versions WHERE id = last_insert_rowid()").fetchone()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return self._artifact(row)
+
+    @staticmethod
+    def _artifact(row: Optional[sqlite3.Row]) -> Optional[Artifact]:
+        if row is None:
+            return None
+        return Artifact(row["sha256"], row["company"], row["file"], row["size"], row["created_at"], row["job_id"])
+
+    def get(self, sha256: str) -> Optional[Artifact]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM versions WHERE sha256 = ? ORDER BY id DESC LIMIT 1", (sha256,)
+            ).fetchone()
+        return self._artifact(row)
+
+    def latest_file(self, file: str) -> Optional[Artifact]:
+        """Newest version stored under a report file name."""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM versions WHERE file = ? ORDER BY id DESC LIMIT 1", (file,)).fetchone()
+        return self._artifact(row)
+
+    def versions(self, company: str) -> List[Artifact]:
+        """Every stored version of a company's report, newest first."""
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM versions WHERE company = ? ORDER BY id DESC", (company,)).fetchall()
+        return [self._artifact(r) for r in rows]
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide artifact store under ``ARTIFACT_DIR``."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(ARTIFACT_DIR)
+        return _store
@@ -1,12 +1,19 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
-from my_first_crew.tools.custom_tool import FlexibleSerperDevTool
+from my_first_crew.tools.custom_tool import BatchSerperDevTool, FlexibleSerperDevTool
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from concurrent.futures import Future
+from typing import List, Optional
+import contextvars
 import os
+import threading
 from my_first_crew.tools.custom_tool import CrawlWebsiteTool
 from dotenv import load_dotenv
 from my_first_crew.custom_llm import Gemini
+from my_first_crew.incremental import SourceLedger
+from my_first_crew.artifacts import Artifact, get_artifact_store
+from my_first_crew.metrics import current_tags
+from my_first_crew.tracing import annotate
 
 load_dotenv()
 
@@ -16,6 +23,41 @@ gemini_llm = Gemini(
     temperature=0.5,
 )
 
+# "parallel" runs crawl_task and news_task at the same time; "sequential" runs one after another
+CREW_EXECUTION = os.getenv("CREW_EXECUTION", "parallel")
+# Update the previous report from changed sources only, instead of researching from scratch
+CREW_INCREMENTAL = os.getenv("CREW_INCREMENTAL", "false").lower() in ("1", "true", "yes")
+
+PREVIOUS_REPORT_NOTE = (
+  "\n\nThis is an update of an existing report. The research above only contains sources that are new or "
+  "changed since it was written; sources listed as unchanged are already covered by it. Keep what is still "
+  "accurate, revise sections the new findings affect and add what is new. The previous report:\n\n"
+)
+
+
+class ContextTask(Task):
+  """Task whose async execution thread inherits the caller's contextvars (job id tags).
+
+  A failure is also passed on to the returned future, so tasks waiting on it
+  through `context` fail instead of blocking forever.
+  """
+
+  def execute_async(self, agent=None, context=None, tools=None) -> Future:
+    future: Future = Future()
+    ctx = contextvars.copy_context()
+    threading.Thread(
+      daemon=True,
+      target=ctx.run,
+      args=(self._execute_task_async, agent, context, tools, future),
+    ).start()
+    return future
+
+  def _execute_task_async(self, agent, context, tools, future: Future) -> None:
+    try:
+      future.set_result(self._execute_core(agent, context, tools))
+    except BaseException as exc:
+      future.set_exception(exc)
+
 
 @CrewBase
 class CompetitorResearchCrew():
@@ -24,23 +66,75 @@ class CompetitorResearchCrew():
   agents: List[BaseAgent]
   tasks: List[Task]
 
+  def __init__(self, execution: Optional[str] = None, incremental: Optional[bool] = None):
+    self.execution = execution or CREW_EXECUTION
+    if self.execution not in ("parallel", "sequential"):
+      raise ValueError(f"execution must be 'parallel' or 'sequential', got {self.execution!r}")
+    self.timings: dict = {}
+    # Shared by every tool of this crew; always records fingerprints, filters only when incremental
+    self.ledger = SourceLedger(incremental=CREW_INCREMENTAL if incremental is None else incremental)
+    # The stored version of this run's report, once it has been written
+    self.artifact: Optional[Artifact] = None
+
+  @property
+  def parallel(self) -> bool:
+    return self.execution == "parallel"
+
   @before_kickoff
   def before_kickoff_function(self, inputs):
-    print(f"🚀 Starting Crew with inputs: {inputs}")
+    print(f"🚀 Starting Crew ({self.execution}) with inputs: {inputs}")
+    previous = self.ledger.open(inputs["company"]).previous_report()
+    if previous:
+      print(f"♻️ Incremental run: updating {self.ledger.report_path}")
+    inputs["previous_report"] = PREVIOUS_REPORT_NOTE + previous if previous else ""
+    annotate(company=inputs["company"], execution=self.execution, incremental=bool(previous))
     return inputs
 
   @after_kickoff
   def after_kickoff_function(self, result):
+    self.timings = self.task_timings()
+    self.ledger.save()
+    self.artifact = self.store_report()
+    annotate(sources=self.ledger.delta(), artifact=self.artifact.sha256 if self.artifact else None)
     print(f"✅ Crew completed with result:\n{result}")
+    print(f"⏱️ Task timings: {self.timings}")
+    print(f"🧾 Sources: {self.ledger.delta()}")
     return result
 
+  def store_report(self) -> Optional[Artifact]:
+    """Keep this run's report as a new version in the artifact store."""
+    report = self.ledger.report_path
+    if not report.exists():
+      return None
+    try:
+      artifact = get_artifact_store().put(self.ledger.company, report, job_id=current_tags.get().get("job_id"))
+    except Exception as exc:
+      print(f"⚠️ Could not store report version: {exc}")
+      return None
+    print(f"🗂️ Report version {artifact.sha256[:12]} stored")
+    return artifact
+
+  def task_timings(self) -> dict:
+    """Seconds spent in each task plus the wall-clock time from first start to last end."""
+    timings = {"execution": self.execution, "tasks": {}}
+    starts, ends = [], []
+    for task in self.tasks:
+      if task.start_time is None or task.end_time is None:
+        continue
+      starts.append(task.start_time)
+      ends.append(task.end_time)
+      timings["tasks"][task.name] = round((task.end_time - task.start_time).total_seconds(), 3)
+    if starts:
+      timings["wall_seconds"] = round((max(ends) - min(starts)).total_seconds(), 3)
+    return timings
+
   # Crawler Agent
   @agent
   def crawler_agent(self) -> Agent:
     return Agent(
       config=self.agents_config['crawler_agent'],  # YAML-based config
       verbose=True,
-      tools=[CrawlWebsiteTool(),FlexibleSerperDevTool()],
+      tools=[CrawlWebsiteTool(ledger=self.ledger),FlexibleSerperDevTool(ledger=self.ledger)],
       llm=gemini_llm  
     )
 
@@ -50,7 +144,7 @@ class CompetitorResearchCrew():
     return Agent(
       config=self.agents_config['news_agent'],
       verbose=True,
-      tools = [FlexibleSerperDevTool()],
+      tools = [BatchSerperDevTool(ledger=self.ledger), FlexibleSerperDevTool(ledger=self.ledger)],
       llm=gemini_llm
     )
 
@@ -66,15 +160,17 @@ class CompetitorResearchCrew():
   # Crawl Task
   @task
   def crawl_task(self) -> Task:
-    return Task(
-      config=self.tasks_config['crawl_task']
+    return ContextTask(
+      config=self.tasks_config['crawl_task'],
+      async_execution=self.parallel,
     )
 
   # News Task
   @task
   def news_task(self) -> Task:
-    return Task(
-      config=self.tasks_config['news_task']
+    return ContextTask(
+      config=self.tasks_config['news_task'],
+      async_execution=self.parallel,
     )
 
   # Summary Task
@@ -87,6 +183,8 @@ class CompetitorResearchCrew():
     )
 
   # Crew definition
+  # In parallel mode crawl_task and news_task run concurrently and summary_task,
+  # which depends on both through `context`, waits for them to finish
   @crew
   def crew(self) -> Crew:
     """Creates the Competitor Research Crew"""
@@ -1,21 +1,234 @@
 from crewai import BaseLLM
-from typing import Any, Dict, List, Optional, Union
-from my_first_crew.tools.custom_tool import CrawlWebsiteTool, FlexibleSerperDevTool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from my_first_crew.tools.custom_tool import BatchSerperDevTool, CrawlWebsiteTool, FlexibleSerperDevTool
+from my_first_crew.tools.cache import CACHE_DIR, DiskCache, get_cache
+from my_first_crew.tools.text import estimate_tokens
+from my_first_crew.rate_limit import MAX_RETRIES, get_limiter, is_retryable
+from my_first_crew.metrics import METRICS, tagged
+from my_first_crew.scheduler import check_cancelled
+from my_first_crew.tracing import annotate, next_iteration, span
 from google import genai
 from google.genai import types
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+import asyncio
+import copy
+import os
 import time
 import json
 import hashlib
 import re
+import threading
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
+# off: always call the API | cache: reuse identical responses | record: call and save every
+# response | replay: answer only from saved responses, never touching the network
+LLM_CACHE_MODE = os.getenv("GEMINI_CACHE_MODE", "off")
+LLM_CACHE_MAX_MB = float(os.getenv("GEMINI_CACHE_MAX_MB", "200"))
+LLM_RECORDINGS = Path(os.getenv("GEMINI_RECORDINGS", str(CACHE_DIR / "gemini_recordings.sqlite")))
+CACHE_MODES = ("off", "cache", "record", "replay")
+
+
+# Compiled once; these run over every message of every turn
+TOOL_BLOCK = re.compile(r"Tool Name:.*?(?=(\nTool Name:|\Z))", re.S)
+TOOL_PATTERN = re.compile(
+    r"Tool Name:\s*(.+?)\nTool Arguments:\s*(\{.*?\})\nTool Description:\s*(.+?)(?=\nTool Name:|\Z)",
+    re.S
+)
+ACTION = re.compile(r"Action:\s*(\w+)")
+ACTION_INPUT = re.compile(r"Action Input:\s*(\{.*?\})", re.S)
+OBSERVATION_START = re.compile(r"Observation:\s*(?=\{)")
+MEMO_SIZE = int(os.getenv("GEMINI_MEMO_SIZE", "512"))
+# Bytes of message text the memo may hold; bigger messages (e.g. large crawl observations) are not kept
+MEMO_MAX_BYTES = int(float(os.getenv("GEMINI_MEMO_MAX_MB", "32")) * 1024 * 1024)
+MEMO_MAX_ENTRY_BYTES = MEMO_MAX_BYTES // 16
+
+
+def extract_observation(text: str) -> Optional[str]:
+    """The JSON-looking body after ``Observation:``, from its first ``{`` to the last ``}``.
+
+    Matches what the old greedy ``{.*}`` regex captured, without backtracking
+    through a whole crawl observation to find the closing brace.
+    """
+    match = OBSERVATION_START.search(text)
+    if not match:
+        return None
+    end = text.rfind("}")
+    if end < match.end():
+        return None
+    return text[match.end():end + 1].strip()
+
+
+def estimate_message_tokens(messages: Union[str, List[Dict[str, Any]]]) -> int:
+    """Prompt size estimate used to reserve tokens-per-minute quota before a call."""
+    if isinstance(messages, str):
+        return estimate_tokens(messages)
+    return sum(estimate_tokens(m.get("content") or "") for m in messages if isinstance(m.get("content"), str))
+
+
+def caller_tags(kwargs: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Agent role and task name CrewAI passes to ``call`` as ``from_agent`` / ``from_task``."""
+    agent = kwargs.get("from_agent")
+    task = kwargs.get("from_task")
+    return {
+        "agent": getattr(agent, "role", None),
+        "task": getattr(task, "name", None) if task is not None else None,
+    }
+
+
+def trace_usage(response: Any, cached: bool):
+    """Record a response's token counts on the current ``llm.call`` span."""
+    usage = getattr(response, "usage_metadata", None)
+    annotate(
+        cache_hit=cached,
+        prompt_tokens=getattr(usage, "prompt_token_count", None),
+        output_tokens=getattr(usage, "candidates_token_count", None),
+        thinking_tokens=getattr(usage, "thoughts_token_count", None),
+    )
+
+
+class ReplayMissError(LookupError):
+    """Replay mode was asked for a response that was never recorded."""
+
+
+def default_response_cache(mode: str) -> Optional[DiskCache]:
+    """Size-bounded disk cache for ``cache`` mode; an unbounded recording for record/replay."""
+    if mode == "cache":
+        return get_cache("gemini", max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024))
+    if mode in ("record", "replay"):
+        return DiskCache(LLM_RECORDINGS)
+    return None
+
+
+# Receives each piece of generated text as it arrives: (text, is_thought)
+StreamCallback = Callable[[str, bool], None]
+
+class RetryStream:
+    """Forwards to a stream callback until an attempt has streamed text.
+
+    Retries after that are not streamed, so text of the failed attempt is not sent twice.
+    """
+
+    def __init__(self, callback: Optional[StreamCallback]):
+        self.callback = callback
+        self.started = False
+
+    def __call__(self, text: str, thought: bool):
+        self.started = True
+        self.callback(text, thought)
+
+    def for_attempt(self) -> Optional[StreamCallback]:
+        return self if self.callback is not None and not self.started else None
+
+
+# Stream callback of the job running in this context, used when neither the call nor the instance sets one
+job_stream: ContextVar[Optional[StreamCallback]] = ContextVar("job_stream", default=None)
+
+
+@contextmanager
+def streaming_to(callback: Optional[StreamCallback]) -> Iterator[None]:
+    """Stream every Gemini call made inside the block (by any agent of the job) to ``callback``."""
+    token = job_stream.set(callback)
+    try:
+        yield
+    finally:
+        job_stream.reset(token)
+
+
+def _emit(callback: Optional[StreamCallback], part: types.Part):
+    if not callback or not part.text:
+        return
+    try:
+        callback(part.text, bool(part.thought))
+    except Exception as exc:
+        logging.warning(f"Stream callback failed: {exc}")
+
+
+def replay_to_callback(response: types.GenerateContentResponse, callback: Optional[StreamCallback]):
+    """Send a complete (e.g. cached) response to a stream callback in one go."""
+    if callback and response.candidates and response.candidates[0].content:
+        for part in response.candidates[0].content.parts or []:
+            _emit(callback, part)
+
+
+class StreamAccumulator:
+    """Forwards streamed chunks to a callback and merges them into one response.
+
+    Consecutive text parts of the same kind (thought or answer) are joined so the
+    merged response looks like a non-streamed one to ``_parse_response``.
+    """
+
+    def __init__(self, callback: Optional[StreamCallback] = None):
+        self.callback = callback
+        self.parts: List[types.Part] = []
+        self.last: Optional[types.GenerateContentResponse] = None
+
+    def add(self, chunk: types.GenerateContentResponse):
+        self.last = chunk
+        if not chunk.candidates or not chunk.candidates[0].content:
+            return
+        for part in chunk.candidates[0].content.parts or []:
+            _emit(self.callback, part)
+            prev = self.parts[-1] if self.parts else None
+            if (prev is not None and part.text is not None and prev.text is not None
+                    and not part.function_call and not prev.function_call
+                    and bool(part.thought) == bool(prev.thought)):
+                update = {"text": prev.text + part.text}
+                if part.thought_signature:
+                    update["thought_signature"] = part.thought_signature
+                self.parts[-1] = prev.model_copy(update=update)
+            else:
+                self.parts.append(part)
+
+    def response(self) -> types.GenerateContentResponse:
+        if self.last is None:
+            return types.GenerateContentResponse()
+        finish_reason = self.last.candidates[0].finish_reason if self.last.candidates else None
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(
+                content=types.Content(role="model", parts=self.parts),
+                finish_reason=finish_reason,
+            )],
+            usage_metadata=self.last.usage_metadata,
+        )
+
+
+_tool_instances: Optional[Dict[str, Any]] = None
+
+
+def get_tool_instances() -> Dict[str, Any]:
+    """Tool objects matched against names in the system prompt, created once per process."""
+    global _tool_instances
+    if _tool_instances is None:
+        _tool_instances = {
+            "fast_web_crawler": CrawlWebsiteTool(),
+            "FlexibleSerperDevTool": FlexibleSerperDevTool(),
+            "BatchSerperDevTool": BatchSerperDevTool(),
+        }
+    return _tool_instances
+
+
 class Gemini(BaseLLM):
-    def __init__(self, model: str, api_key: str, temperature: Optional[float] = None):
+    def __init__(self, model: str, api_key: str, temperature: Optional[float] = None,
+                 cache_mode: Optional[str] = None, response_cache: Any = None,
+                 stream_callback: Optional[StreamCallback] = None):
         super().__init__(model=model, temperature=temperature)
+        self.stream_callback = stream_callback
+        self._conversions: OrderedDict = OrderedDict()  # key -> (value, size)
+        self._memo_bytes = 0
+        self._memo_lock = threading.Lock()
+        self.limiter = get_limiter("gemini")
         self.api_key = api_key
-        self.client = genai.Client(api_key=api_key)
+        self.cache_mode = cache_mode or LLM_CACHE_MODE
+        if self.cache_mode not in CACHE_MODES:
+            raise ValueError(f"cache_mode must be one of {CACHE_MODES}, got {self.cache_mode!r}")
+        # Any object with DiskCache-style get(key) / set(key, value) can be plugged in
+        self.response_cache = response_cache if response_cache is not None else default_response_cache(self.cache_mode)
+        self.client = None if self.cache_mode == "replay" else genai.Client(api_key=api_key)
 
     def call(
         self,
@@ -23,38 +236,192 @@ class Gemini(BaseLLM):
         tools: Optional[List[Any]] = None,
         callbacks: Optional[List[Any]] = None,
         available_functions: Optional[Dict[str, Any]] = None,
+        stream_callback: Optional[StreamCallback] = None,
         **kwargs
     ) -> str:
+        check_cancelled()
+        contents, config = self._prepare(messages, tools, available_functions)
+        stream_callback = stream_callback or self.stream_callback or job_stream.get()
+
+        estimated = estimate_message_tokens(messages)
+        tags = caller_tags(kwargs)
+        # Each call to the LLM starts the agent's next Thought/Action round
+        next_iteration(agent=tags["agent"])
+
+        stream = RetryStream(stream_callback)
+        last_exc: Optional[Exception] = None
+        with span("llm.call", model=self.model, estimated_tokens=estimated, **tags):
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    annotate(attempts=attempt + 1)
+                    with tagged(**tags):
+                        response = self._generate(contents, config, stream.for_attempt(), estimated)
+                    return self._finish(response, messages)
+                except ReplayMissError:
+                    raise
+                except Exception as exc:
+                    last_exc = exc
+                    # Rate limits and server errors back off and retry; anything else gets one more try
+                    if attempt >= (MAX_RETRIES if is_retryable(exc) else 1):
+                        break
+                    delay = self.limiter.backoff(exc, attempt)
+                    logging.warning(f"Gemini call failed: {exc}, retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+
+            raise last_exc
+
+    async def acall(
+        self,
+        messages: Union[str, List[Dict[str, Any]]],
+        tools: Optional[List[Any]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        stream_callback: Optional[StreamCallback] = None,
+        **kwargs
+    ) -> str:
+        """Same as ``call`` but awaits ``client.aio`` so many calls can share one event loop."""
+        check_cancelled()
+        contents, config = self._prepare(messages, tools, available_functions)
+        stream_callback = stream_callback or self.stream_callback or job_stream.get()
+
+        estimated = estimate_message_tokens(messages)
+        tags = caller_tags(kwargs)
+        # Each call to the LLM starts the agent's next Thought/Action round
+        next_iteration(agent=tags["agent"])
+
+        stream = RetryStream(stream_callback)
+        last_exc: Optional[Exception] = None
+        with span("llm.call", model=self.model, estimated_tokens=estimated, **tags):
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    annotate(attempts=attempt + 1)
+                    with tagged(**tags):
+                        response = await self._agenerate(contents, config, stream.for_attempt(), estimated)
+                    return self._finish(response, messages)
+                except ReplayMissError:
+                    raise
+                except Exception as exc:
+                    last_exc = exc
+                    # Rate limits and server errors back off and retry; anything else gets one more try
+                    if attempt >= (MAX_RETRIES if is_retryable(exc) else 1):
+                        break
+                    delay = self.limiter.backoff(exc, attempt)
+                    logging.warning(f"Gemini call failed: {exc}, retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+
+            raise last_exc
+
+    def _prepare(
+        self,
+        messages: Union[str, List[Dict[str, Any]]],
+        tools: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> tuple[list[types.Content], types.GenerateContentConfig]:
         if not tools or not available_functions:
             extracted_tools, extracted_functions = self._extract_tools_from_system_message(messages)
             tools = tools or extracted_tools
             available_functions = available_functions or extracted_functions
         contents, system_instruction = self._to_contents(messages)
-        config = self._to_config(tools, available_functions, system_instruction)
-
-        last_exc: Optional[Exception] = None
-        for _ in range(2):
-            try:
-                response = self.client.models.generate_content(
-                    model=self.model,
-                    contents=contents,
-                    config=config,
-                )
-
-                # Validate response
-                if not response or not hasattr(response, 'candidates') or not response.candidates:
-                    logging.warning("Gemini returned empty response.")
-                    return "I apologize, but I couldn't generate a response. Please try again."
-
-                parsed_response = self._parse_response(response, messages)
-                return str(parsed_response)
-
-            except Exception as exc:
-                last_exc = exc
-                logging.warning(f"Gemini call failed: {exc}, retrying...")
-                time.sleep(0.7)
+        return contents, self._to_config(tools, available_functions, system_instruction)
+
+    def _finish(self, response: Any, messages: Union[str, List[Dict[str, Any]]]) -> str:
+        # Validate response
+        if not response or not hasattr(response, 'candidates') or not response.candidates:
+            logging.warning("Gemini returned empty response.")
+            return "I apologize, but I couldn't generate a response. Please try again."
+
+        parsed_response = self._parse_response(response, messages)
+        return str(parsed_response)
+
+    def _cache_key(self, contents: list[types.Content], config: types.GenerateContentConfig) -> str:
+        """Stable hash of everything that determines the response."""
+        payload = {
+            "model": self.model,
+            "contents": [c.model_dump(mode="json", exclude_none=True) for c in contents],
+            "config": config.model_dump(mode="json", exclude_none=True),
+            "temperature": self.temperature,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _lookup(self, contents: list[types.Content], config: types.GenerateContentConfig) -> tuple[Optional[str], Any]:
+        """Cache key (None when caching is off) and the stored response, if there is one."""
+        if self.cache_mode == "off" or self.response_cache is None:
+            return None, None
 
-        raise last_exc
+        key = self._cache_key(contents, config)
+        if self.cache_mode in ("cache", "replay"):
+            entry = self.response_cache.get(key)
+            if entry is not None:
+                # DiskCache wraps values in a CacheEntry; plain get/set backends return them as stored
+                return key, types.GenerateContentResponse.model_validate(getattr(entry, "value", entry))
+            if self.cache_mode == "replay":
+                raise ReplayMissError(f"No recorded Gemini response for request {key[:12]}")
+        return key, None
+
+    def _settle(self, estimated_tokens: int, response: Any):
+        usage = getattr(response, "usage_metadata", None)
+        self.limiter.settle(estimated_tokens, getattr(usage, "total_token_count", None))
+
+    def _store(self, key: Optional[str], response: Any):
+        if key and response and response.candidates:
+            self.response_cache.set(key, response.model_dump(mode="json", exclude_none=True))
+
+    def _generate(self, contents: list[types.Content], config: types.GenerateContentConfig,
+                  stream_callback: Optional[StreamCallback] = None, estimated_tokens: int = 0) -> Any:
+        key, response = self._lookup(contents, config)
+        if response is not None:
+            METRICS.record_llm_call(self.model, 0.0, response.usage_metadata, cached=True)
+            trace_usage(response, cached=True)
+            replay_to_callback(response, stream_callback)
+            return response
+
+        waited = time.perf_counter()
+        self.limiter.acquire(estimated_tokens)
+        started = time.perf_counter()
+        annotate(rate_limit_wait_ms=round((started - waited) * 1000, 1))
+
+        if stream_callback:
+            stream = StreamAccumulator(stream_callback)
+            for chunk in self.client.models.generate_content_stream(model=self.model, contents=contents, config=config):
+                stream.add(chunk)
+            response = stream.response()
+        else:
+            response = self.client.models.generate_content(model=self.model, contents=contents, config=config)
+        METRICS.record_llm_call(self.model, time.perf_counter() - started, getattr(response, "usage_metadata", None))
+        trace_usage(response, cached=False)
+        self._settle(estimated_tokens, response)
+        self._store(key, response)
+        return response
+
+    async def _agenerate(self, contents: list[types.Content], config: types.GenerateContentConfig,
+                         stream_callback: Optional[StreamCallback] = None, estimated_tokens: int = 0) -> Any:
+        # The response caches are SQLite files; keep their reads and writes off the event loop
+        key, response = await asyncio.to_thread(self._lookup, contents, config)
+        if response is not None:
+            METRICS.record_llm_call(self.model, 0.0, response.usage_metadata, cached=True)
+            trace_usage(response, cached=True)
+            replay_to_callback(response, stream_callback)
+            return response
+
+        waited = time.perf_counter()
+        await self.limiter.acquire_async(estimated_tokens)
+        started = time.perf_counter()
+        annotate(rate_limit_wait_ms=round((started - waited) * 1000, 1))
+
+        if stream_callback:
+            stream = StreamAccumulator(stream_callback)
+            chunks = await self.client.aio.models.generate_content_stream(model=self.model, contents=contents, config=config)
+            async for chunk in chunks:
+                stream.add(chunk)
+            response = stream.response()
+        else:
+            response = await self.client.aio.models.generate_content(model=self.model, contents=contents, config=config)
+        METRICS.record_llm_call(self.model, time.perf_counter() - started, getattr(response, "usage_metadata", None))
+        trace_usage(response, cached=False)
+        self._settle(estimated_tokens, response)
+        if key:
+            await asyncio.to_thread(self._store, key, response)
+        return response
 
     def _is_react_mode(self, messages):
         system_msg = next((m['content'] for m in messages if m.get('role') == 'system'), "")
@@ -77,83 +444,122 @@ class Gemini(BaseLLM):
                 text = str(text)
 
             if role == "system":
-                clean_text = re.sub(
-                    r"Tool Name:.*?(?=(\nTool Name:|\Z))",
-                    "",
-                    text,
-                    flags=re.S
-                ).strip()
-                system_instruction = clean_text
+                system_instruction = self._memo(("system", text), lambda: TOOL_BLOCK.sub("", text).strip())
             else:
-                mapped_role = "model" if role == "assistant" else "user"
-
-                # Check for Thought → Action → Action Input → Observation format
-                action_match = re.search(r"Action:\s*(\w+)", text)
-                input_match = re.search(r"Action Input:\s*(\{.*?\})", text, flags=re.S)
-                observation_match = re.search(r"Observation:\s*(\{.*\})", text, flags=re.S)
-
-                if action_match and input_match:
-                    # Extract thought text
-                    user_text = text.split("Action:")[0].strip()
-                    thought_part = None
-                    if "Thought:" in user_text:
-                        thought_text = user_text.replace("Thought:", "").strip()
-                        thought_part = types.Part(text=thought_text, thought=True)
-
-                    # Parse function call args
-                    try:
-                        func_args = json.loads(input_match.group(1))
-                    except json.JSONDecodeError:
-                        func_args = {}
+                contents.extend(self._memo((role, text), lambda: self._convert_message(role, text)))
 
-                    func_name = action_match.group(1)
-                    function_part = types.Part(
-                        function_call=types.FunctionCall(name=func_name, args=func_args)
-                    )
+        return contents, system_instruction
 
-                    # Build model content (thought + function_call)
-                    model_parts = []
-                    if thought_part:
-                        model_parts.append(thought_part)
-                    model_parts.append(function_part)
-
-                    contents.append(types.Content(
-                        role="model",
-                        parts=model_parts
-                    ))
-
-                    # If observation exists → separate user content
-                    if observation_match:
-                        obs_text = observation_match.group(1).strip()
-                        try:
-                            func_response = json.loads(obs_text)
-                        except json.JSONDecodeError:
-                            func_response = {"text": obs_text}
-
-                        contents.append(types.Content(
-                            role="user",
-                            parts=[types.Part(
-                                function_response=types.FunctionResponse(
-                                    name=func_name,
-                                    response=func_response
-                                )
-                            )]
-                        ))
+    def _memo(self, key: tuple, build: Callable[[], Any]) -> Any:
+        """Per-instance LRU memo, so each transcript message is converted only once.
+
+        CrewAI resends the same message strings every turn; their hashes are cached
+        on the str objects, so a lookup costs O(1) no matter how long the message is.
+        """
+        with self._memo_lock:
+            entry = self._conversions.get(key)
+            if entry is not None:
+                self._conversions.move_to_end(key)
+                return entry[0]
+        value = build()
+        # Converted contents hold about as much text as the key, so count it twice
+        size = 2 * sum(len(part) for part in key if isinstance(part, str))
+        if size > MEMO_MAX_ENTRY_BYTES:
+            return value
+        # One instance is shared by agents running in parallel threads
+        with self._memo_lock:
+            previous = self._conversions.pop(key, None)
+            if previous is not None:
+                self._memo_bytes -= previous[1]
+            self._conversions[key] = (value, size)
+            self._memo_bytes += size
+            while self._conversions and (len(self._conversions) > MEMO_SIZE or self._memo_bytes > MEMO_MAX_BYTES):
+                self._memo_bytes -= self._conversions.popitem(last=False)[1][1]
+        return value
+
+    def _convert_message(self, role: str, text: str) -> list[types.Content]:
+        mapped_role = "model" if role == "assistant" else "user"
+
+        # Check for Thought → Action → Action Input → Observation format
+        action_match = ACTION.search(text)
+        input_match = ACTION_INPUT.search(text) if action_match else None
+        if not (action_match and input_match):
+            # Default case for normal text
+            return [types.Content(role=mapped_role, parts=[types.Part(text=text)])]
+
+        # Extract thought text
+        user_text = text.split("Action:")[0].strip()
+        thought_part = None
+        if "Thought:" in user_text:
+            thought_text = user_text.replace("Thought:", "").strip()
+            thought_part = types.Part(text=thought_text, thought=True)
+
+        # Parse function call args
+        try:
+            func_args = json.loads(input_match.group(1))
+        except json.JSONDecodeError:
+            func_args = {}
 
-                else:
-                    # Default case for normal text
-                    contents.append(types.Content(role=mapped_role, parts=[types.Part(text=text)]))
+        func_name = action_match.group(1)
+        function_part = types.Part(
+            function_call=types.FunctionCall(name=func_name, args=func_args)
+        )
 
-        return contents, system_instruction
+        # Build model content (thought + function_call)
+        model_parts = []
+        if thought_part:
+            model_parts.append(thought_part)
+        model_parts.append(function_part)
+        contents = [types.Content(role="model", parts=model_parts)]
+
+        # If observation exists → separate user content
+        obs_text = extract_observation(text)
+        if obs_text is not None:
+            try:
+                func_response = json.loads(obs_text)
+            except json.JSONDecodeError:
+                func_response = {"text": obs_text}
+
+            contents.append(types.Content(
+                role="user",
+                parts=[types.Part(
+                    function_response=types.FunctionResponse(
+                        name=func_name,
+                        response=func_response
+                    )
+                )]
+            ))
+        return contents
 
     def _to_config(
         self,
         tools: Optional[List[Any]],
         available_functions: Optional[Dict[str, Any]],
         system_instruction: Optional[str]
+    ) -> types.GenerateContentConfig:
+        # Tools and system prompt rarely change within a conversation; reuse the built config
+        key = (
+            "config",
+            system_instruction,
+            json.dumps(tools, sort_keys=True, default=str) if tools else "",
+            tuple(
+                (name, getattr(fn, "description", ""), getattr(fn, "args_schema", None))
+                for name, fn in (available_functions or {}).items()
+            ),
+            self.temperature,
+        )
+        return self._memo(key, lambda: self._build_config(tools, available_functions, system_instruction))
+
+    def _build_config(
+        self,
+        tools: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+        system_instruction: Optional[str]
     ) -> types.GenerateContentConfig:
         genai_tools: List[types.Tool] = []
         seen_func_names = set()
+        # The declarations are memoized per system prompt and are part of the config key; convert a copy
+        tools = copy.deepcopy(tools)
         TYPE_MAP = {"str": "string", "int": "integer", "float": "number", "bool": "boolean"}
 
         def convert_types(properties: dict) -> dict:
@@ -163,6 +569,11 @@ class Gemini(BaseLLM):
                     t = val.get("type")
                     if t in TYPE_MAP:
                         val["type"] = TYPE_MAP[t]
+                    elif isinstance(t, str) and t.lower().startswith("list"):
+                        # CrewAI renders List[str] as "list[str]"; Gemini wants an array schema
+                        inner = t[t.find("[") + 1:-1] if "[" in t else "str"
+                        val["type"] = "array"
+                        val["items"] = {"type": TYPE_MAP.get(inner, "string")}
                     if "properties" in val:
                         val["properties"] = convert_types(val["properties"])
                 new_props[key] = val
@@ -308,23 +719,21 @@ class Gemini(BaseLLM):
         return function_call_result or text_response or ""
 
     def _extract_tools_from_system_message(self, messages):
+        if isinstance(messages, str):
+            return None, None
+        system_msg = next((m['content'] for m in messages if m.get('role') == 'system'), "")
+        if not system_msg:
+            return None, None
+        # The system prompt is identical on every turn, so parse it once
+        return self._memo(("tools", system_msg), lambda: self._parse_tool_block(system_msg))
+
+    def _parse_tool_block(self, system_msg: str):
         try:
             tools_list = []
             available_functions = {}
-            system_msg = next((m['content'] for m in messages if m.get('role') == 'system'), "")
-            if not system_msg:
-                return None, None
-
-            tool_pattern = re.compile(
-                r"Tool Name:\s*(.+?)\nTool Arguments:\s*(\{.*?\})\nTool Description:\s*(.+?)(?=\nTool Name:|\Z)",
-                re.S
-            )
-            actual_tools = {
-                "fast_web_crawler": CrawlWebsiteTool(),
-                "FlexibleSerperDevTool": FlexibleSerperDevTool()
-            }
-
-            for match in tool_pattern.finditer(system_msg):
+            actual_tools = get_tool_instances()
+
+            for match in TOOL_PATTERN.finditer(system_msg):
                 name = match.group(1).strip()
                 args_raw = match.group(2).strip()
                 desc = match.group(3).strip()
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from my_first_crew.metrics import current_tags
+
+# Events kept per job so a client that connects late (or reconnects) can catch up
+EVENT_HISTORY = int(os.getenv("EVENT_HISTORY", "2000"))
+EVENT_MAX_JOBS = int(os.getenv("EVENT_MAX_JOBS", "200"))
+
+
+@dataclass
+class Event:
+    id: int
+    type: str  # status | task | tool | text
+    data: Dict[str, Any]
+
+    def sse(self) -> str:
+        """The event in the text/event-stream wire format."""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class _Channel:
+    def __init__(self, history: int):
+        self.next_id = 1
+        self.events: Deque[Event] = deque(maxlen=history)
+        self.subscribers: List[Tuple[asyncio.Queue, asyncio.AbstractEventLoop]] = []
+
+
+class EventBroker:
+    """Fans out per-job progress events from worker threads to asyncio subscribers.
+
+    ``publish`` may be called from any thread; each subscriber gets events through
+    its own queue on its own event loop, so a slow client never blocks a crew.
+    """
+
+    def __init__(self, history: int = EVENT_HISTORY, max_jobs: int = EVENT_MAX_JOBS):
+        self.history = history
+        self.max_jobs = max_jobs
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, job_id: str) -> _Channel:
+        channel = self._channels.get(job_id)
+        if channel is None:
+            channel = self._channels[job_id] = _Channel(self.history)
+            while len(self._channels) > self.max_jobs:
+                self._channels.popitem(last=False)
+        self._channels.move_to_end(job_id)
+        return channel
+
+    def publish(self, job_id: str, type: str, data: Dict[str, Any]) -> Event:
+        with self._lock:
+            channel = self._channel(job_id)
+            event = Event(channel.next_id, type, data)
+            channel.next_id += 1
+            channel.events.append(event)
+            subscribers = list(channel.subscribers)
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's loop is gone; it unsubscribes when its stream closes
+                pass
+        return event
+
+    def subscribe(self, job_id: str, after: int = 0) -> Tuple[List[Event], asyncio.Queue]:
+        """Events newer than ``after`` plus a queue for the ones still to come."""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            channel = self._channel(job_id)
+            channel.subscribers.append((queue, asyncio.get_running_loop()))
+            backlog = [e for e in channel.events if e.id > after]
+        return backlog, queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel is not None:
+                channel.subscribers = [s for s in channel.subscribers if s[0] is not queue]
+
+
+BROKER = EventBroker()
+
+
+def publish(type: str, **data: Any) -> Optional[Event]:
+    """Publish an event for the job running in the current thread, if any."""
+    tags = current_tags.get()
+    job_id = tags.get("job_id")
+    if not job_id:
+        return None
+    return BROKER.publish(job_id, type, {k: v for k, v in data.items() if v is not None})
+
+
+def stream_text(text: str, thought: bool):
+    """Gemini stream callback that forwards generated text to the job's event stream."""
+    tags = current_tags.get()
+    publish("text", text=text, thought=thought or None, agent=tags.get("agent"), task=tags.get("task"))
+
+
+_listeners_installed = False
+
+
+def install_event_listeners():
+    """Publish CrewAI task and tool progress to the event stream of the job that caused it."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+    from crewai.events.types.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent, ToolUsageStartedEvent
+
+    def task_fields(task) -> Dict[str, Any]:
+        agent = getattr(task, "agent", None)
+        return {"task": getattr(task, "name", None), "agent": getattr(agent, "role", None)}
+
+    # Like the metrics listeners, these run in the agent's thread, so current_tags names the job
+    @crewai_event_bus.on(TaskStartedEvent)
+    def _task_started(source, event):
+        publish("task", status="started", **task_fields(event.task))
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def _task_completed(source, event):
+        publish("task", status="completed", **task_fields(event.task))
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def _task_failed(source, event):
+        publish("task", status="failed", error=str(event.error), **task_fields(event.task))
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def _tool_started(source, event):
+        publish("tool", status="started", tool=event.tool_name, agent=event.agent_role, task=event.task_name)
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _tool_finished(source, event):
+        publish("tool", status="finished", tool=event.tool_name, agent=event.agent_role, task=event.task_name,
+                seconds=round((event.finished_at - event.started_at).total_seconds(), 3))
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _tool_failed(source, event):
+        publish("tool", status="error", tool=event.tool_name, agent=event.agent_role, task=event.task_name,
+                error=str(event.error))
+
+    _listeners_installed = True
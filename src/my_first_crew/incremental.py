@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+OUTPUT_DIR = Path("output")
+# Fingerprints of sources no run has seen for this many seconds are dropped
+SOURCE_MAX_AGE = float(os.getenv("INCREMENTAL_SOURCE_MAX_AGE", str(90 * 24 * 3600)))
+SEARCH_SECTIONS = ("organic", "news")
+
+
+def fingerprint(content: str) -> str:
+    """Content hash that ignores whitespace, so a re-flowed but identical page still matches."""
+    return hashlib.sha256(" ".join(content.split()).encode("utf-8")).hexdigest()
+
+
+class SourceLedger:
+    """Fingerprints of the crawled pages and search results behind a company's report.
+
+    Every run records what its tools saw and saves it next to the report as
+    ``output/{company}_sources.json``. When ``incremental`` is on and both the
+    previous report and its ledger exist, the ledger is ``active``: tools then
+    leave out sources whose content has not changed since that report.
+    """
+
+    def __init__(self, incremental: bool = False, directory: Path = OUTPUT_DIR):
+        self.incremental = incremental
+        self.directory = Path(directory)
+        self.company: Optional[str] = None
+        self.active = False
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.current: Dict[str, Dict[str, Any]] = {}
+        self.changed: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{self.company}_sources.json"
+
+    @property
+    def report_path(self) -> Path:
+        return self.directory / f"{self.company}_analysis.md"
+
+    def open(self, company: str) -> "SourceLedger":
+        """Start a run for ``company``, loading the fingerprints saved with its last report."""
+        with self._lock:
+            self.company = company
+            self.current, self.changed = {}, []
+            try:
+                self.previous = json.loads(self.path.read_text(encoding="utf-8")).get("sources", {})
+                saved = True
+            except (OSError, ValueError):
+                self.previous, saved = {}, False
+            self.active = self.incremental and saved and self.report_path.exists()
+        return self
+
+    def record(self, kind: str, key: str, content: str) -> bool:
+        """Remember a source's fingerprint; True when it is new or changed since the last report."""
+        source = f"{kind}:{key}"
+        digest = fingerprint(content)
+        with self._lock:
+            self.current[source] = {"fingerprint": digest, "seen_at": time.time()}
+            old = self.previous.get(source)
+            changed = old is None or old["fingerprint"] != digest
+            if changed:
+                self.changed.append(source)
+        return changed
+
+    def previous_report(self) -> Optional[str]:
+        if not self.active:
+            return None
+        try:
+            return self.report_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def delta(self) -> Dict[str, int]:
+        with self._lock:
+            return {"seen": len(self.current), "changed": len(set(self.changed)),
+                    "unchanged": len(set(self.current) - set(self.changed))}
+
+    def save(self):
+        """Write the fingerprints of this run, keeping recent ones it did not revisit."""
+        cutoff = time.time() - SOURCE_MAX_AGE
+        with self._lock:
+            sources = {k: v for k, v in self.previous.items() if v.get("seen_at", 0) >= cutoff}
+            sources.update(self.current)
+            data = {"company": self.company, "saved_at": time.time(), "sources": sources}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def filter_search_results(results: dict, ledger: Optional[SourceLedger]) -> dict:
+    """Record search results in the ledger and, when it is active, drop the unchanged ones."""
+    if ledger is None or not isinstance(results, dict):
+        return results
+    filtered = dict(results)
+    unchanged = 0
+    for section in SEARCH_SECTIONS:
+        kept = []
+        for item in results.get(section, []):
+            # Snippets depend on the query and news dates are relative ("3 days ago"), so only
+            # the link and title identify a result that is the same as last time
+            content = " ".join(str(item.get(k, "")) for k in ("link", "title"))
+            if ledger.record("search", item.get("link") or content, content) or not ledger.active:
+                kept.append(item)
+            else:
+                unchanged += 1
+        if section in results:
+            filtered[section] = kept
+    if unchanged:
+        filtered["unchangedSinceLastReport"] = unchanged
+    return filtered
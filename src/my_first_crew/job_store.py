@@ -0,0 +1,391 @@
+import json
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from my_first_crew.tools.cache import CACHE_DIR
+
+JOB_STORE = os.getenv("JOB_STORE", "sqlite")  # sqlite | memory
+JOB_DB = Path(os.getenv("JOB_DB", str(CACHE_DIR / "jobs.sqlite")))
+# Finished jobs are forgotten after this many seconds
+JOB_TTL = float(os.getenv("JOB_TTL", str(7 * 24 * 3600)))
+# A claimed job with no update or heartbeat for this long is assumed lost with its worker
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "3600"))
+
+TERMINAL_STAGES = {"done", "error", "cancelled", "timeout"}
+STALE_MESSAGE = "Worker stopped responding"
+FIELDS = ("company", "stage", "message", "file", "artifact", "timings", "metrics")
+
+
+def dedup_key(company: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Identity of a research request: the company name, case- and spacing-insensitive, plus its options."""
+    name = " ".join(unicodedata.normalize("NFKC", company).casefold().split())
+    return f"{name}|{json.dumps(options or {}, sort_keys=True)}"
+
+
+class JobStore(ABC):
+    """Where job status lives, so API processes and workers share one view of every job.
+
+    A job is a dict with ``job_id``, ``company``, ``stage``, ``message``, ``file``
+    (the report's file name), ``artifact`` (its content hash in the artifact
+    store), ``timings``, ``metrics``, ``created_at``,
+    ``updated_at``, ``claimed_by``, ``cancel_requested`` and ``dedup_key``. Every
+    stage change is also appended to the job's history. ``update`` leaves fields
+    passed as None unchanged.
+    """
+
+    @abstractmethod
+    def create(self, job_id: str, company: str, message: Optional[str] = None,
+               claimed_by: Optional[str] = None, dedup_key: Optional[str] = None) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def find_or_create(self, job_id: str, company: str, dedup_key: str, fresh_for: float = 0,
+                       message: Optional[str] = None, claimed_by: Optional[str] = None,
+                       max_queued: Optional[int] = None) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Return ``(job, created)``, atomically with respect to other callers.
+
+        An unfinished job with the same ``dedup_key`` that is not being cancelled
+        is reused, then a ``done`` job with a report finished within ``fresh_for``
+        seconds; otherwise a new queued job is created, unless ``max_queued``
+        jobs are already queued, in which case ``(None, False)`` is returned.
+        """
+
+    @abstractmethod
+    def update(self, job_id: str, stage: str, message: Optional[str] = None, **fields) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def history(self, job_id: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest unclaimed queued job, or None."""
+
+    @abstractmethod
+    def touch(self, job_id: str) -> bool:
+        """Mark an unfinished job as still being worked on, without adding to its history."""
+
+    @abstractmethod
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag a job for cancellation; whichever process runs it will stop it."""
+
+    @abstractmethod
+    def count(self, stage: str) -> int:
+        ...
+
+    @abstractmethod
+    def cleanup(self, ttl: float = JOB_TTL, stale_after: float = JOB_STALE_AFTER) -> int:
+        """Drop finished jobs older than ``ttl`` and fail jobs whose worker went silent."""
+
+
+class MemoryJobStore(JobStore):
+    """Single-process store; state is lost on restart."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._history: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _insert(self, job_id, company, message, claimed_by, dedup_key) -> Dict[str, Any]:
+        now = time.time()
+        job = {"job_id": job_id, "company": company, "stage": "queued", "message": message, "file": None,
+               "artifact": None, "timings": None, "metrics": None, "created_at": now, "updated_at": now, "claimed_by": claimed_by,
+               "cancel_requested": False, "dedup_key": dedup_key}
+        self._jobs[job_id] = job
+        self._history[job_id] = [{"stage": "queued", "message": message, "at": now}]
+        return dict(job)
+
+    def create(self, job_id, company, message=None, claimed_by=None, dedup_key=None):
+        with self._lock:
+            return self._insert(job_id, company, message, claimed_by, dedup_key)
+
+    def find_or_create(self, job_id, company, dedup_key, fresh_for=0, message=None, claimed_by=None,
+                       max_queued=None):
+        with self._lock:
+            now = time.time()
+            same = sorted((j for j in self._jobs.values() if j["dedup_key"] == dedup_key),
+                          key=lambda j: j["created_at"], reverse=True)
+            for job in same:
+                if job["stage"] not in TERMINAL_STAGES and not job["cancel_requested"]:
+                    return dict(job), False
+            for job in same:
+                if job["stage"] == "done" and job["file"] and now - job["updated_at"] <= fresh_for:
+                    return dict(job), False
+            if max_queued is not None and sum(1 for j in self._jobs.values() if j["stage"] == "queued") >= max_queued:
+                return None, False
+            # Inserted under the same lock as the lookup, so concurrent callers cannot both miss
+            return self._insert(job_id, company, message, claimed_by, dedup_key), True
+
+    def update(self, job_id, stage, message=None, **fields):
+        now = time.time()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update({k: v for k, v in fields.items() if k in FIELDS and v is not None},
+                       stage=stage, message=message, updated_at=now)
+            self._history[job_id].append({"stage": stage, "message": message, "at": now})
+            return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def history(self, job_id):
+        with self._lock:
+            return list(self._history.get(job_id, []))
+
+    def claim_next(self, worker_id):
+        with self._lock:
+            queued = [j for j in self._jobs.values()
+                      if j["stage"] == "queued" and not j["claimed_by"] and not j["cancel_requested"]]
+            if not queued:
+                return None
+            job = min(queued, key=lambda j: j["created_at"])
+            job["claimed_by"] = worker_id
+            return dict(job)
+
+    def touch(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["stage"] in TERMINAL_STAGES:
+                return False
+            job["updated_at"] = time.time()
+            return True
+
+    def request_cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job["cancel_requested"] = True
+            return True
+
+    def count(self, stage):
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j["stage"] == stage)
+
+    def cleanup(self, ttl=JOB_TTL, stale_after=JOB_STALE_AFTER):
+        now = time.time()
+        with self._lock:
+            expired = [k for k, j in self._jobs.items() if j["stage"] in TERMINAL_STAGES and now - j["updated_at"] > ttl]
+            for job_id in expired:
+                self._jobs.pop(job_id)
+                self._history.pop(job_id, None)
+            for job in self._jobs.values():
+                if job["claimed_by"] and job["stage"] not in TERMINAL_STAGES and now - job["updated_at"] > stale_after:
+                    job.update(stage="error", message=STALE_MESSAGE, updated_at=now)
+                    self._history[job["job_id"]].append({"stage": "error", "message": STALE_MESSAGE, "at": now})
+            return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a SQLite file (WAL mode), shared by every process on the host."""
+
+    def __init__(self, path: Path = JOB_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, company TEXT NOT NULL, stage TEXT NOT NULL, message TEXT,"
+            " file TEXT, timings TEXT, metrics TEXT, created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL, claimed_by TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0,"
+            " dedup_key TEXT, artifact TEXT)"
+        )
+        # Databases created by older versions lack the newer columns
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column in ("dedup_key", "artifact"):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_stage ON jobs (stage, created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key, created_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            " job_id TEXT NOT NULL, stage TEXT NOT NULL, message TEXT, at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, at)")
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ("timings", "metrics"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def _insert(self, job_id, company, message, claimed_by, dedup_key):
+        now = time.time()
+        self._db.execute(
+            "INSERT INTO jobs (job_id, company, stage, message, created_at, updated_at, claimed_by, dedup_key)"
+            " VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+            (job_id, company, message, now, now, claimed_by, dedup_key),
+        )
+        self._db.execute("INSERT INTO job_events VALUES (?, 'queued', ?, ?)", (job_id, message, now))
+
+    def create(self, job_id, company, message=None, claimed_by=None, dedup_key=None):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._insert(job_id, company, message, claimed_by, dedup_key)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return self.get(job_id)
+
+    def find_or_create(self, job_id, company, dedup_key, fresh_for=0, message=None, claimed_by=None,
+                       max_queued=None):
+        full = False
+        terminal = tuple(TERMINAL_STAGES)
+        marks = ", ".join("?" for _ in terminal)
+        with self._lock:
+            # The write lock makes lookup and insert one step, so concurrent API processes
+            # asking for the same company end up on the same job
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    f"SELECT job_id FROM jobs WHERE dedup_key = ? AND stage NOT IN ({marks})"
+                    " AND cancel_requested = 0 ORDER BY created_at DESC LIMIT 1",
+                    (dedup_key, *terminal),
+                ).fetchone()
+                if row is None and fresh_for > 0:
+                    row = self._db.execute(
+                        "SELECT job_id FROM jobs WHERE dedup_key = ? AND stage = 'done' AND file IS NOT NULL"
+                        " AND updated_at >= ? ORDER BY updated_at DESC LIMIT 1",
+                        (dedup_key, time.time() - fresh_for),
+                    ).fetchone()
+                if row is None and max_queued is not None:
+                    queued = self._db.execute("SELECT COUNT(*) FROM jobs WHERE stage = 'queued'").fetchone()[0]
+                    full = queued >= max_queued
+                if row is None and not full:
+                    self._insert(job_id, company, message, claimed_by, dedup_key)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if row is not None:
+            return self.get(row["job_id"]), False
+        if full:
+            return None, False
+        return self.get(job_id), True
+
+    def update(self, job_id, stage, message=None, **fields):
+        now = time.time()
+        columns = {k: (json.dumps(v) if k in ("timings", "metrics") and v is not None else v)
+                   for k, v in fields.items() if k in FIELDS and v is not None}
+        columns.update(stage=stage, message=message, updated_at=now)
+        assignments = ", ".join(f"{k} = ?" for k in columns)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._db.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*columns.values(), job_id))
+                if cursor.rowcount:
+                    self._db.execute("INSERT INTO job_events VALUES (?, ?, ?, ?)", (job_id, stage, message, now))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return self.get(job_id)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._row(self._db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone())
+
+    def history(self, job_id):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT stage, message, at FROM job_events WHERE job_id = ? ORDER BY at, rowid", (job_id,)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def claim_next(self, worker_id):
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock first, so two workers can never claim the same job
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT job_id FROM jobs WHERE stage = 'queued' AND claimed_by IS NULL"
+                    " AND cancel_requested = 0 ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE jobs SET claimed_by = ? WHERE job_id = ?", (worker_id, row["job_id"]))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return self.get(row["job_id"]) if row is not None else None
+
+    def touch(self, job_id):
+        terminal = tuple(TERMINAL_STAGES)
+        marks = ", ".join("?" for _ in terminal)
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET updated_at = ? WHERE job_id = ? AND stage NOT IN ({marks})",
+                (time.time(), job_id, *terminal),
+            )
+            return cursor.rowcount > 0
+
+    def request_cancel(self, job_id):
+        with self._lock:
+            cursor = self._db.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+            return cursor.rowcount > 0
+
+    def count(self, stage):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs WHERE stage = ?", (stage,)).fetchone()[0]
+
+    def cleanup(self, ttl=JOB_TTL, stale_after=JOB_STALE_AFTER):
+        now = time.time()
+        terminal = tuple(TERMINAL_STAGES)
+        marks = ", ".join("?" for _ in terminal)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                expired = [r[0] for r in self._db.execute(
+                    f"SELECT job_id FROM jobs WHERE stage IN ({marks}) AND updated_at < ?", (*terminal, now - ttl)
+                ).fetchall()]
+                self._db.executemany("DELETE FROM jobs WHERE job_id = ?", [(j,) for j in expired])
+                self._db.executemany("DELETE FROM job_events WHERE job_id = ?", [(j,) for j in expired])
+                stale = [r[0] for r in self._db.execute(
+                    f"SELECT job_id FROM jobs WHERE claimed_by IS NOT NULL AND stage NOT IN ({marks}) AND updated_at < ?",
+                    (*terminal, now - stale_after),
+                ).fetchall()]
+                self._db.executemany("UPDATE jobs SET stage = 'error', message = ?, updated_at = ? WHERE job_id = ?",
+                                     [(STALE_MESSAGE, now, j) for j in stale])
+                self._db.executemany("INSERT INTO job_events VALUES (?, 'error', ?, ?)",
+                                     [(j, STALE_MESSAGE, now) for j in stale])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(expired)
+
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Process-wide job store selected by ``JOB_STORE``."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MemoryJobStore() if JOB_STORE == "memory" else SQLiteJobStore(JOB_DB)
+        return _store
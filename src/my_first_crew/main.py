@@ -1,13 +1,68 @@
 from my_first_crew.crew import CompetitorResearchCrew
-from typing import List
+from my_first_crew.metrics import METRICS, tagged
+from my_first_crew.tracing import TRACING, trace_job, trace_path
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+import json
+import os
+import sys
+import time
 
+# Companies researched at once; the crews share the browser pool, rate limiters and caches
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+OUTPUT_DIR = Path("output")
 
-def run(companies: List[str]) -> None:
-    """Run the Competitor Research Crew for a list of companies."""
-    for company_name in companies:
-        inputs = {"company": company_name}
-        CompetitorResearchCrew().crew().kickoff(inputs=inputs)
-    
+
+def run_company(company_name: str, incremental: Optional[bool] = None) -> dict:
+    """Research one company and return its timings, or the error that stopped it."""
+    started = time.perf_counter()
+    record = {"company": company_name, "status": "ok", "report": str(OUTPUT_DIR / f"{company_name}_analysis.md")}
+    research_crew = CompetitorResearchCrew(incremental=incremental)
+    try:
+        with tagged(job_id=company_name), trace_job(company_name, company=company_name):
+            research_crew.crew().kickoff(inputs={"company": company_name})
+    except Exception as exc:
+        record.update(status="error", error=f"{type(exc).__name__}: {exc}", report=None)
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    record["tasks"] = research_crew.timings.get("tasks", {})
+    record["metrics"] = METRICS.job_summary(company_name)
+    record["sources"] = research_crew.ledger.delta()
+    if TRACING:
+        record["trace"] = str(trace_path(company_name))
+    return record
+
+
+def run(companies: Optional[List[str]] = None, workers: Optional[int] = None,
+        incremental: Optional[bool] = None) -> dict:
+    """Run the Competitor Research Crew for a list of companies, several at a time.
+
+    Each company gets its own report in ``output/``; timings and failures for the
+    whole batch are written to ``output/batch_summary.json`` and returned.
+    ``incremental`` (default ``CREW_INCREMENTAL``) updates existing reports from
+    changed sources only.
+    """
+    companies = companies or sys.argv[1:] or ["OpenAI"]
+    companies = list(dict.fromkeys(c.strip() for c in companies if c.strip()))
+    workers = max(1, min(workers or BATCH_WORKERS, len(companies)))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="company") as pool:
+        records = list(pool.map(lambda c: run_company(c, incremental), companies))
+
+    summary = {
+        "workers": workers,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "sum_seconds": round(sum(r["seconds"] for r in records), 3),
+        "succeeded": [r["company"] for r in records if r["status"] == "ok"],
+        "failed": {r["company"]: r["error"] for r in records if r["status"] == "error"},
+        "companies": records,
+    }
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    (OUTPUT_DIR / "batch_summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"📊 Batch finished: {len(summary['succeeded'])} ok, {len(summary['failed'])} failed "
+          f"in {summary['wall_seconds']}s (serial would be ~{summary['sum_seconds']}s)")
+    return summary
 
 
 if __name__ == "__main__":
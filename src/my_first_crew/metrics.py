@@ -0,0 +1,244 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# USD per million tokens; thinking tokens are billed as output
+GEMINI_INPUT_PRICE = float(os.getenv("GEMINI_INPUT_PRICE", "0.30"))
+GEMINI_OUTPUT_PRICE = float(os.getenv("GEMINI_OUTPUT_PRICE", "2.50"))
+MAX_JOB_SUMMARIES = int(os.getenv("METRICS_MAX_JOBS", "500"))
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# job_id / agent / task of the work running in the current thread or task
+current_tags: ContextVar[Dict[str, str]] = ContextVar("metric_tags", default={})
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+@contextmanager
+def tagged(**tags: Optional[str]) -> Iterator[Dict[str, str]]:
+    """Attach tags (e.g. ``job_id``) to every metric recorded inside the block."""
+    merged = {**current_tags.get(), **{k: str(v) for k, v in tags.items() if v}}
+    token = current_tags.set(merged)
+    try:
+        yield merged
+    finally:
+        current_tags.reset(token)
+
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    # Agent roles from the YAML config end in a newline
+    return tuple(sorted((k, str(v).strip()) for k, v in labels.items() if v is not None))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, value: float = 1, **labels):
+        key = _labels(labels)
+        self.values[key] = self.values.get(key, 0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(k)} {v:g}" for k, v in sorted(self.values.items())]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.values: Dict[LabelKey, List[float]] = {}  # bucket counts..., sum, count
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        row = self.values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                row[i] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, row in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, row):
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': f'{bound:g}'})} {count:g}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {row[-1]:g}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {row[-2]:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {row[-1]:g}")
+        return lines
+
+
+class Metrics:
+    """Process-wide metrics for LLM calls, tool calls and crawled pages.
+
+    Prometheus series are labelled only by low-cardinality tags (agent, task,
+    model, tool, tier); per-job totals are kept separately for ``JobStatus``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.llm_calls = Counter("crew_llm_calls_total", "LLM requests, by cache outcome")
+        self.llm_tokens = Counter("crew_llm_tokens_total", "LLM tokens by kind (prompt, output, thinking, cached)")
+        self.llm_cost = Counter("crew_llm_cost_usd_total", "Estimated LLM spend in USD")
+        self.llm_latency = Histogram("crew_llm_latency_seconds", "LLM request latency")
+        self.tool_calls = Counter("crew_tool_calls_total", "Tool invocations, by outcome")
+        self.tool_bytes = Counter("crew_tool_output_bytes_total", "Bytes returned by tools to the agent")
+        self.tool_latency = Histogram("crew_tool_latency_seconds", "Tool latency")
+        self.pages = Counter("crew_crawl_pages_total", "Crawled pages by tier, status and cache outcome")
+        self.page_bytes = Counter("crew_crawl_bytes_total", "Extracted text bytes by tier")
+        self.page_latency = Histogram("crew_crawl_page_seconds", "Per-page crawl time")
+        self.searches = Counter("crew_search_requests_total", "Web searches by cache outcome (hit, miss, coalesced, off)")
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _job(self, tags: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        job_id = tags.get("job_id")
+        if not job_id:
+            return None
+        job = self.jobs.get(job_id)
+        if job is None:
+            job = self.jobs[job_id] = {
+                "llm_calls": 0, "llm_cache_hits": 0, "llm_seconds": 0.0, "prompt_tokens": 0,
+                "output_tokens": 0, "thinking_tokens": 0, "cost_usd": 0.0,
+                "tools": {}, "pages": 0, "page_bytes": 0, "crawl_seconds": 0.0,
+            }
+            while len(self.jobs) > MAX_JOB_SUMMARIES:
+                self.jobs.popitem(last=False)
+        return job
+
+    def record_llm_call(self, model: str, seconds: float, usage: Any = None, cached: bool = False,
+                        agent: Optional[str] = None, task: Optional[str] = None):
+        tags = current_tags.get()
+        labels = {"model": model, "agent": agent or tags.get("agent"), "task": task or tags.get("task")}
+        prompt = getattr(usage, "prompt_token_count", None) or 0
+        output = getattr(usage, "candidates_token_count", None) or 0
+        thinking = getattr(usage, "thoughts_token_count", None) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+        cost = 0.0 if cached else (prompt * GEMINI_INPUT_PRICE + (output + thinking) * GEMINI_OUTPUT_PRICE) / 1e6
+
+        with self._lock:
+            self.llm_calls.inc(cache="hit" if cached else "miss", **labels)
+            if not cached:
+                self.llm_latency.observe(seconds, **labels)
+                for kind, count in (("prompt", prompt), ("output", output), ("thinking", thinking), ("cached", cached_tokens)):
+                    if count:
+                        self.llm_tokens.inc(count, kind=kind, **labels)
+                self.llm_cost.inc(cost, **labels)
+            job = self._job(tags)
+            if job is not None:
+                if cached:
+                    job["llm_cache_hits"] += 1
+                else:
+                    job["llm_calls"] += 1
+                    job["llm_seconds"] += seconds
+                    job["prompt_tokens"] += prompt
+                    job["output_tokens"] += output
+                    job["thinking_tokens"] += thinking
+                    job["cost_usd"] += cost
+
+    def record_tool_call(self, tool: str, seconds: float, output_bytes: int = 0, error: bool = False,
+                         agent: Optional[str] = None, task: Optional[str] = None):
+        tags = current_tags.get()
+        labels = {"tool": tool, "agent": agent or tags.get("agent"), "task": task or tags.get("task")}
+        with self._lock:
+            self.tool_calls.inc(outcome="error" if error else "ok", **labels)
+            self.tool_latency.observe(seconds, **labels)
+            self.tool_bytes.inc(output_bytes, **labels)
+            job = self._job(tags)
+            if job is not None:
+                stats = job["tools"].setdefault(tool, {"calls": 0, "errors": 0, "seconds": 0.0, "bytes": 0})
+                stats["calls"] += 1
+                stats["errors"] += int(error)
+                stats["seconds"] += seconds
+                stats["bytes"] += output_bytes
+
+    def record_page(self, tier: str, status: str, cache: str, seconds: float, size: int):
+        tags = current_tags.get()
+        with self._lock:
+            self.pages.inc(tier=tier, status=status, cache=cache)
+            self.page_bytes.inc(size, tier=tier)
+            self.page_latency.observe(seconds, tier=tier)
+            job = self._job(tags)
+            if job is not None:
+                job["pages"] += 1
+                job["page_bytes"] += size
+                job["crawl_seconds"] += seconds
+
+    def record_search(self, cache: str):
+        with self._lock:
+            self.searches.inc(cache=cache)
+
+    def job_summary(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            summary = {k: round(v, 6) if isinstance(v, float) else v for k, v in job.items() if k != "tools"}
+            summary["tools"] = {
+                name: {k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}
+                for name, stats in job["tools"].items()
+            }
+            return summary
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        with self._lock:
+            series = (self.llm_calls, self.llm_tokens, self.llm_cost, self.llm_latency, self.tool_calls,
+                      self.tool_bytes, self.tool_latency, self.pages, self.page_bytes, self.page_latency,
+                      self.searches)
+            return "\n".join(line for s in series for line in s.render()) + "\n"
+
+
+METRICS = Metrics()
+
+_listeners_installed = False
+
+
+def install_crewai_listeners():
+    """Record every CrewAI tool call (latency, output size, agent, task) from its event bus."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent, ToolUsageStartedEvent
+
+    started: Dict[Tuple[int, str], float] = {}
+
+    # Handlers run synchronously in the agent's thread, so current_tags carries the job id
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def _tool_started(source, event):
+        started[(threading.get_ident(), event.tool_name)] = event.timestamp.timestamp()
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _tool_finished(source, event):
+        started.pop((threading.get_ident(), event.tool_name), None)
+        METRICS.record_tool_call(
+            event.tool_name, (event.finished_at - event.started_at).total_seconds(),
+            len(str(event.output or "").encode("utf-8")), agent=event.agent_role, task=event.task_name,
+        )
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _tool_failed(source, event):
+        began = started.pop((threading.get_ident(), event.tool_name), None)
+        seconds = event.timestamp.timestamp() - began if began else 0.0
+        METRICS.record_tool_call(event.tool_name, seconds, error=True, agent=event.agent_role, task=event.task_name)
+
+    _listeners_installed = True
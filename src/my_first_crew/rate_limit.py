@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+# Per-minute quotas; 0 disables that limit
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "0"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "0"))
+SERPER_RPM = float(os.getenv("SERPER_RPM", "0"))
+# Seconds of quota that may be spent in one burst
+BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "10"))
+MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX = float(os.getenv("RATE_LIMIT_BACKOFF_MAX", "60"))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRY_DELAY = re.compile(r"^([\d.]+)s$")
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of refusing callers.
+
+    ``reserve`` always succeeds: the bucket may go into debt and the caller is
+    told how long to wait until its share is available. Because reservations
+    are taken in arrival order, callers are served first come, first served.
+    Not thread-safe on its own; ``RateLimiter`` holds the lock.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, at: float) -> float:
+        """Take ``amount`` at time ``at``; returns the extra wait needed after ``at``."""
+        self.tokens = min(self.capacity, self.tokens + max(0.0, at - self.updated) * self.rate)
+        self.updated = max(self.updated, at)
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, amount: float):
+        """Charge (or refund, if negative) tokens after the real cost is known."""
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """Process-wide request/token limits for one provider.
+
+    ``acquire`` blocks (or ``acquire_async`` awaits) until the call fits the
+    quota. When the provider answers 429 with Retry-After, ``backoff`` pauses
+    every caller of the limiter, not just the one that was rejected.
+    """
+
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.paused_until = 0.0
+        self.waited = 0.0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 0) -> float:
+        """Book one request of ``tokens`` tokens and return the seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self.paused_until)
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, start))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, start))
+            delay = start - now + wait
+            self.waited += delay
+            return delay
+
+    def acquire(self, tokens: float = 0):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 0):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def settle(self, estimated: float, actual: Optional[float]):
+        """Correct the token bucket once the provider reports the real usage."""
+        if self.tokens is None or actual is None:
+            return
+        with self._lock:
+            self.tokens.adjust(actual - estimated)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def backoff(self, exc: BaseException, attempt: int) -> float:
+        """Seconds to sleep before retry number ``attempt`` (0-based) after ``exc``.
+
+        A server-provided Retry-After pauses the whole limiter and the next
+        ``acquire`` waits it out, so only the jittered part is returned then.
+        """
+        self.retries += 1
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            self.pause(retry_after)
+            return random.uniform(0, BACKOFF_BASE)
+        return backoff_delay(attempt)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"retries": self.retries, "waited_seconds": round(self.waited, 3)}
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status of a google-genai ``APIError`` or a ``requests`` ``HTTPError``."""
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limiting, server errors, timeouts and dropped connections are worth retrying."""
+    code = status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return isinstance(exc, (TimeoutError, ConnectionError)) or type(exc).__name__ in {
+        "ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout", "ConnectError", "ReadError",
+    }
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Delay requested by the server, from a Retry-After header or Gemini's RetryInfo."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    details = getattr(exc, "details", None)
+    if isinstance(details, dict):
+        for item in (details.get("error") or {}).get("details") or []:
+            match = RETRY_DELAY.match(str(item.get("retryDelay", "")))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+def call_with_retry(limiter: RateLimiter, fn: Callable[[], Any], tokens: float = 0,
+                    max_retries: int = MAX_RETRIES) -> Any:
+    """Run ``fn`` within ``limiter``'s quota, retrying retryable errors with backoff."""
+    for attempt in range(max_retries + 1):
+        limiter.acquire(tokens)
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= max_retries or not is_retryable(exc):
+                raise
+            delay = limiter.backoff(exc, attempt)
+            logging.warning(f"{limiter.name} call failed ({exc}); retry {attempt + 1} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """Return the process-wide limiter for ``"gemini"``, ``"serper"`` or any other provider."""
+    with _limiters_lock:
+        if name not in _limiters:
+            if name == "gemini":
+                _limiters[name] = RateLimiter(name, rpm=GEMINI_RPM, tpm=GEMINI_TPM)
+            elif name == "serper":
+                _limiters[name] = RateLimiter(name, rpm=SERPER_RPM)
+            else:
+                _limiters[name] = RateLimiter(name)
+        return _limiters[name]
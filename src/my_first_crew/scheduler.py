@@ -0,0 +1,188 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "2"))
+SERVER_MAX_QUEUE = int(os.getenv("SERVER_MAX_QUEUE", "8"))
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "1800"))
+# How often running jobs are checked for cancellation requested by another process
+CANCEL_POLL_INTERVAL = float(os.getenv("CANCEL_POLL_INTERVAL", "2"))
+# How often a running job tells the job store it is still alive; keep it well below JOB_STALE_AFTER
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "60"))
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once it has been cancelled or has run out of time."""
+
+    def __init__(self, job_id: str, reason: str):
+        super().__init__(f"Job {job_id} {reason}")
+        self.job_id = job_id
+        self.reason = reason
+
+
+@dataclass
+class JobHandle:
+    job_id: str
+    future: Optional[Future] = None
+    submitted_at: float = 0.0
+    started_at: Optional[float] = None
+    cancel_reason: Optional[str] = None  # cancelled | timeout
+    timer: Optional[threading.Timer] = None
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None
+
+
+# The job the current thread is working for; set by the scheduler's worker threads
+current_job: ContextVar[Optional[JobHandle]] = ContextVar("current_job", default=None)
+
+
+def check_cancelled():
+    """Stop the current job at a safe point (e.g. before an LLM call) if it was cancelled."""
+    job = current_job.get()
+    if job is not None and job.cancel_reason:
+        raise JobCancelled(job.job_id, job.cancel_reason)
+
+
+class JobScheduler:
+    """Runs blocking jobs on a bounded thread pool with a queue limit, cancellation and timeouts.
+
+    ``submit`` refuses work (returns None) once ``workers + max_queue`` jobs are
+    waiting or running, so callers can push back instead of queueing forever;
+    ``reserve`` takes the slot ahead of time, before the job is recorded anywhere.
+    Queued jobs are cancelled outright; running jobs are asked to stop and do so
+    at the next ``check_cancelled`` call, since a crew kickoff cannot be
+    interrupted from outside its thread.
+    """
+
+    def __init__(self, workers: int = SERVER_WORKERS, max_queue: int = SERVER_MAX_QUEUE,
+                 timeout: Optional[float] = JOB_TIMEOUT,
+                 on_timeout: Optional[Callable[[str], None]] = None,
+                 poll_cancel: Optional[Callable[[str], bool]] = None,
+                 heartbeat: Optional[Callable[[str], Any]] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        # Returns True when a job was cancelled elsewhere (e.g. through a shared job store)
+        self.poll_cancel = poll_cancel
+        # Called every JOB_HEARTBEAT_INTERVAL for each job in this scheduler, so long crews are not taken for dead
+        self.heartbeat = heartbeat
+        self.jobs: Dict[str, JobHandle] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._stopped = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def full(self) -> bool:
+        with self._lock:
+            return len(self.jobs) >= self.workers + self.max_queue
+
+    @property
+    def idle(self) -> int:
+        """Worker threads with nothing to do."""
+        with self._lock:
+            return max(0, self.workers - len(self.jobs))
+
+    def reserve(self, job_id: str) -> Optional[JobHandle]:
+        """Hold a queue slot for a job that will be submitted shortly; None when full."""
+        with self._lock:
+            if len(self.jobs) >= self.workers + self.max_queue:
+                return None
+            handle = JobHandle(job_id=job_id, submitted_at=time.time())
+            self.jobs[job_id] = handle
+            return handle
+
+    def release(self, job_id: str):
+        """Give back a slot held by ``reserve`` that will not be submitted after all."""
+        with self._lock:
+            handle = self.jobs.get(job_id)
+            if handle is not None and handle.future is None:
+                self.jobs.pop(job_id)
+
+    def submit(self, job_id: str, fn: Callable[..., Any], *args) -> Optional[JobHandle]:
+        """Queue ``fn(*args)`` in the slot held for ``job_id``, or in a new one; None when full."""
+        with self._lock:
+            handle = self.jobs.get(job_id)
+        if handle is None or handle.future is not None:
+            handle = self.reserve(job_id)
+            if handle is None:
+                return None
+        # Run in a copy of the caller's context so its tags reach the worker thread
+        ctx = contextvars.copy_context()
+        handle.future = self._pool.submit(ctx.run, self._run, handle, fn, *args)
+        if (self.poll_cancel is not None or self.heartbeat is not None) and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="job-watcher", daemon=True)
+            self._watcher.start()
+        return handle
+
+    def _watch(self):
+        last_beat = time.monotonic()
+        while not self._stopped.wait(CANCEL_POLL_INTERVAL):
+            with self._lock:
+                pending = [h.job_id for h in self.jobs.values() if not h.cancel_reason]
+            beat = self.heartbeat is not None and time.monotonic() - last_beat >= JOB_HEARTBEAT_INTERVAL
+            if beat:
+                last_beat = time.monotonic()
+            for job_id in pending:
+                try:
+                    if beat:
+                        self.heartbeat(job_id)
+                    if self.poll_cancel is not None and self.poll_cancel(job_id):
+                        self.cancel(job_id)
+                except Exception as exc:
+                    logging.warning(f"Could not check on job {job_id}: {exc}")
+
+    def _run(self, handle: JobHandle, fn: Callable[..., Any], *args) -> Any:
+        token = current_job.set(handle)
+        handle.started_at = time.time()
+        if self.timeout:
+            handle.timer = threading.Timer(self.timeout, self._expire, args=(handle.job_id,))
+            handle.timer.daemon = True
+            handle.timer.start()
+        try:
+            return fn(*args)
+        finally:
+            if handle.timer:
+                handle.timer.cancel()
+            current_job.reset(token)
+            with self._lock:
+                self.jobs.pop(handle.job_id, None)
+
+    def _expire(self, job_id: str):
+        if self.cancel(job_id, reason="timeout") and self.on_timeout:
+            try:
+                self.on_timeout(job_id)
+            except Exception as exc:
+                logging.warning(f"Timeout handler failed for job {job_id}: {exc}")
+
+    def cancel(self, job_id: str, reason: str = "cancelled") -> bool:
+        """Cancel a queued job or ask a running one to stop; False if the job is not active."""
+        with self._lock:
+            handle = self.jobs.get(job_id)
+            if handle is None:
+                return False
+            handle.cancel_reason = handle.cancel_reason or reason
+            if handle.future is not None and handle.future.cancel():
+                self.jobs.pop(job_id, None)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            running = sum(1 for h in self.jobs.values() if h.running)
+            return {"workers": self.workers, "running": running, "queued": len(self.jobs) - running,
+                    "max_queue": self.max_queue}
+
+    def shutdown(self):
+        self._stopped.set()
+        for job_id in list(self.jobs):
+            self.cancel(job_id, reason="cancelled")
+        self._pool.shutdown(wait=False, cancel_futures=True)
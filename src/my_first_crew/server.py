@@ -1,14 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
-import uuid
+from contextlib import asynccontextmanager
 import asyncio
+import json
+import socket
+import uuid
 import os
 
 from my_first_crew.crew import CompetitorResearchCrew
+from my_first_crew.custom_llm import streaming_to
+from my_first_crew.tools.browser_pool import shutdown_browser_pool
+from my_first_crew.metrics import METRICS, install_crewai_listeners, tagged
+from my_first_crew.scheduler import SERVER_MAX_QUEUE, JobCancelled, JobScheduler, check_cancelled
+from my_first_crew.job_store import TERMINAL_STAGES, dedup_key, get_job_store
+from my_first_crew.events import BROKER, install_event_listeners, stream_text
+from my_first_crew.artifacts import Artifact, get_artifact_store
+from my_first_crew.tracing import TRACER, trace_job
 
 
 BASE_DIR = Path(__file__).resolve().parent  # src/my_first_crew
@@ -22,6 +33,8 @@ STATIC_DIR.mkdir(parents=True, exist_ok=True)
 
 class StartRequest(BaseModel):
     company: str
+    # Research again even if a recent report for this company exists
+    force_refresh: bool = False
 
 
 class JobStatus(BaseModel):
@@ -29,29 +42,101 @@ class JobStatus(BaseModel):
     stage: str
     message: Optional[str] = None
     file: Optional[str] = None
+    artifact: Optional[str] = None
+    metrics: Optional[dict] = None
+    timings: Optional[dict] = None
+    company: Optional[str] = None
+    created_at: Optional[float] = None
+    updated_at: Optional[float] = None
+    # True when /api/start returned an existing job instead of starting a new one
+    reused: bool = False
+
+
+# Seconds a client is told to wait when the job queue is full
+RETRY_AFTER = int(os.getenv("SERVER_RETRY_AFTER", "30"))
+# "local" runs jobs in this process; "worker" only queues them for `worker` processes to claim
+JOB_RUNNER = os.getenv("JOB_RUNNER", "local")
+# A finished report younger than this many seconds is returned instead of researching again
+REPORT_FRESH_FOR = float(os.getenv("REPORT_FRESH_FOR", str(6 * 3600)))
+# Seconds between sweeps that expire old jobs and fail jobs whose worker died
+JOB_CLEANUP_INTERVAL = float(os.getenv("JOB_CLEANUP_INTERVAL", "600"))
+# Seconds between job store checks for event streams of jobs run by another process
+EVENT_POLL_INTERVAL = float(os.getenv("EVENT_POLL_INTERVAL", "1"))
+# Seconds of silence after which an event stream sends a keep-alive comment
+EVENT_KEEPALIVE = float(os.getenv("EVENT_KEEPALIVE", "15"))
+
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+STORE = get_job_store()
+ARTIFACTS = get_artifact_store()
+
+
+async def cleanup_jobs():
+    while True:
+        await asyncio.to_thread(STORE.cleanup)
+        await asyncio.sleep(JOB_CLEANUP_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cleanup = asyncio.create_task(cleanup_jobs())
+    yield
+    cleanup.cancel()
+    SCHEDULER.shutdown()
+    # Close the shared Chromium so no orphaned browser processes survive a reload
+    shutdown_browser_pool()
+
+
+app = FastAPI(title="Competitor AI Server", lifespan=lifespan)
+install_crewai_listeners()
+install_event_listeners()
+
+
+def set_status(job_id: str, stage: str, message: Optional[str] = None, file: Optional[str] = None,
+               timings: Optional[dict] = None, metrics: Optional[dict] = None, artifact: Optional[str] = None):
+    job = STORE.update(job_id, stage, message, file=file, timings=timings, metrics=metrics, artifact=artifact)
+    if job is not None:
+        BROKER.publish(job_id, "status", job_status(job).model_dump())
+
+
+def job_status(job: dict) -> JobStatus:
+    status = JobStatus(**{k: job[k] for k in JobStatus.model_fields if k in job})
+    # Live numbers while this process runs the job; the stored summary once it ran elsewhere
+    status.metrics = METRICS.job_summary(status.job_id) or status.metrics
+    return status
 
 
-app = FastAPI(title="Competitor AI Server")
+def cancel_requested(job_id: str) -> bool:
+    job = STORE.get(job_id)
+    return bool(job and job["cancel_requested"])
 
 
-# in-memory job tracking
-JOB_STATUS: dict[str, JobStatus] = {}
+def on_timeout(job_id: str):
+    # The worker stops at its next LLM call or crawl; report the timeout right away
+    set_status(job_id, "timeout", "Job exceeded its time limit and is being stopped")
 
 
-def set_status(job_id: str, stage: str, message: Optional[str] = None, file: Optional[str] = None):
-    JOB_STATUS[job_id] = JobStatus(job_id=job_id, stage=stage, message=message, file=file)
+# Crews run on worker threads so the event loop keeps serving status polls and static files
+SCHEDULER = JobScheduler(on_timeout=on_timeout, poll_cancel=cancel_requested, heartbeat=STORE.touch)
 
 
-async def run_pipeline(job_id: str, company: str):
+def run_pipeline(job_id: str, company: str, stream: bool = True):
+    """Run the crew for one job; ``stream`` sends generated text to the job's event stream."""
     try:
+        check_cancelled()
         set_status(job_id, "exploring", f"Exploring sources for {company}…")
 
         inputs = {"company": company}
 
-        # The crew orchestrates crawl -> news -> summarize sequentially
+        # The crew runs crawl and news research (in parallel by default), then summarizes
         set_status(job_id, "researching", f"Researching {company} across the web…")
-        result = CompetitorResearchCrew().crew().kickoff(inputs=inputs)
-
+        research_crew = CompetitorResearchCrew()
+        # Only this job's Gemini calls stream, and only where /api/events subscribers can see them
+        with tagged(job_id=job_id), trace_job(job_id, company=company), streaming_to(stream_text if stream else None):
+            result = research_crew.crew().kickoff(inputs=inputs)
+        timings = research_crew.timings
+
+        # A job cancelled or timed out during its last step already has its final status; keep it
+        check_cancelled()
         set_status(job_id, "analyzing", f"Analyzing findings for {company}…")
 
         # Output file path as per crew configuration
@@ -63,16 +148,33 @@ async def run_pipeline(job_id: str, company: str):
             if alt.exists():
                 file_path = alt
 
-        if file_path.exists():
-            set_status(job_id, "done", "Completed", file=str(file_path.name))
-        else:
+        if not file_path.exists():
             # Fall back to returning the text result as a file
-            fallback = OUTPUT_DIR / filename
-            fallback.write_text(str(result) if result is not None else "No result", encoding="utf-8")
-            set_status(job_id, "done", "Completed", file=str(fallback.name))
-
+            file_path = OUTPUT_DIR / filename
+            file_path.write_text(str(result) if result is not None else "No result", encoding="utf-8")
+        artifact = research_crew.artifact
+        if artifact is None or artifact.file != file_path.name:
+            artifact = ARTIFACTS.put(company, file_path, job_id=job_id)
+        check_cancelled()
+        set_status(job_id, "done", "Completed", file=str(file_path.name), timings=timings,
+                   metrics=METRICS.job_summary(job_id), artifact=artifact.sha256)
+
+    except JobCancelled as exc:
+        if exc.reason == "timeout":
+            set_status(job_id, "timeout", f"Stopped after exceeding the {SCHEDULER.timeout:.0f}s time limit",
+                       metrics=METRICS.job_summary(job_id))
+        else:
+            set_status(job_id, "cancelled", "Cancelled", metrics=METRICS.job_summary(job_id))
     except Exception as exc:
-        set_status(job_id, "error", f"{type(exc).__name__}: {exc}")
+        set_status(job_id, "error", f"{type(exc).__name__}: {exc}", metrics=METRICS.job_summary(job_id))
+
+
+def queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many jobs in progress, try again later",
+        headers={"Retry-After": str(RETRY_AFTER)},
+    )
 
 
 @app.post("/api/start", response_model=JobStatus)
@@ -81,22 +183,240 @@ async def start_job(req: StartRequest):
     if not company:
         raise HTTPException(status_code=400, detail="company is required")
 
+    # Requests for the same company and options share one job: a running one, or a fresh report
+    key = dedup_key(company, req.model_dump(exclude={"company", "force_refresh"}))
+    fresh_for = 0 if req.force_refresh else REPORT_FRESH_FOR
     job_id = uuid.uuid4().hex
-    set_status(job_id, "queued", f"Queued for {company}")
-    asyncio.create_task(run_pipeline(job_id, company))
-    return JOB_STATUS[job_id]
+    message = f"Queued for {company}"
+    claimed_by = WORKER_ID if JOB_RUNNER == "local" else None
+
+    # A slot is held before the job is stored, so no request can join a job that is then rejected.
+    # When none is left, or the shared queue is full, only an existing job can still be returned.
+    reserved = JOB_RUNNER != "worker" and SCHEDULER.reserve(job_id) is not None
+    if JOB_RUNNER == "worker":
+        max_queued = SERVER_MAX_QUEUE
+    else:
+        max_queued = None if reserved else 0
+
+    created = False
+    try:
+        job, created = await asyncio.to_thread(STORE.find_or_create, job_id, company, key, fresh_for, message,
+                                               claimed_by, max_queued)
+        if job and not created and job["stage"] == "done" and not (OUTPUT_DIR / job["file"]).exists():
+            # The report was removed since; research again
+            job, created = await asyncio.to_thread(STORE.find_or_create, job_id, company, key, 0, message,
+                                                   claimed_by, max_queued)
+    finally:
+        if reserved and not created:
+            SCHEDULER.release(job_id)
+    if job is None:
+        raise queue_full()
+    if not created:
+        return job_status(job).model_copy(update={"reused": True})
+
+    if reserved:
+        SCHEDULER.submit(job_id, run_pipeline, job_id, company)
+    return job_status(job)
+
+
+@app.post("/api/cancel/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    job = await asyncio.to_thread(STORE.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    if job["stage"] in TERMINAL_STAGES:
+        raise HTTPException(status_code=409, detail=f"job is already {job['stage']}")
+    # The flag reaches whichever process runs the job; a local job is stopped right away
+    await asyncio.to_thread(STORE.request_cancel, job_id)
+    SCHEDULER.cancel(job_id)
+    if job["stage"] == "queued":
+        set_status(job_id, "cancelled", "Cancelled before it started")
+    else:
+        set_status(job_id, "cancelling", "Stopping at the next step…")
+    return job_status(await asyncio.to_thread(STORE.get, job_id))
+
+
+@app.get("/api/jobs")
+async def job_queue():
+    """Running and queued job counts of this process, plus jobs queued in the store."""
+    return {**SCHEDULER.stats(), "runner": JOB_RUNNER, "stored_queued": await asyncio.to_thread(STORE.count, "queued")}
 
 
 @app.get("/api/status/{job_id}", response_model=JobStatus)
 async def get_status(job_id: str):
-    status = JOB_STATUS.get(job_id)
-    if not status:
+    job = await asyncio.to_thread(STORE.get, job_id)
+    if not job:
         raise HTTPException(status_code=404, detail="job not found")
-    return status
+    return job_status(job)
+
+
+async def event_stream(request: Request, job_id: str, job: dict, last_id: int):
+    backlog, queue = BROKER.subscribe(job_id, after=last_id)
+    try:
+        # Replay what this process published since last_id; a job run elsewhere starts from the store
+        status = job_status(job).model_dump()
+        if not any(event.type == "status" for event in backlog):
+            yield f"event: status\ndata: {json.dumps(status)}\n\n"
+        for event in backlog:
+            yield event.sse()
+            if event.type == "status":
+                status = event.data
+        quiet = 0.0
+        while status["stage"] not in TERMINAL_STAGES:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=EVENT_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                if job_id not in SCHEDULER.jobs:
+                    # Run by a worker process: only stage changes reach us, through the store
+                    job = await asyncio.to_thread(STORE.get, job_id)
+                    if job and (job["stage"], job["message"]) != (status["stage"], status["message"]):
+                        status = job_status(job).model_dump()
+                        yield f"event: status\ndata: {json.dumps(status)}\n\n"
+                        quiet = 0.0
+                        continue
+                quiet += EVENT_POLL_INTERVAL
+                if quiet >= EVENT_KEEPALIVE:
+                    quiet = 0.0
+                    yield ": keep-alive\n\n"
+                continue
+            quiet = 0.0
+            yield event.sse()
+            if event.type == "status":
+                status = event.data
+        end = {"stage": status["stage"], "message": status["message"]}
+        if status["stage"] == "done":
+            artifact = status.get("artifact")
+            path = None
+            if status.get("file"):
+                path = ARTIFACTS.blob_path(artifact) if artifact else OUTPUT_DIR / status["file"]
+            if path is not None and path.exists():
+                text = await asyncio.to_thread(path.read_text, encoding="utf-8")
+                report = {"file": status["file"], "artifact": artifact, "text": text}
+                yield f"event: report\ndata: {json.dumps(report)}\n\n"
+            else:
+                end["message"] = "The report is no longer available"
+        # Always the last event, so clients close instead of reconnecting to a finished job
+        yield f"event: end\ndata: {json.dumps(end)}\n\n"
+    finally:
+        BROKER.unsubscribe(job_id, queue)
+
+
+@app.get("/api/events/{job_id}")
+async def job_events(job_id: str, request: Request):
+    """Server-sent events: stage changes, task and tool progress, generated text and the final report."""
+    job = await asyncio.to_thread(STORE.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    try:
+        last_id = int(request.headers.get("last-event-id") or 0)
+    except ValueError:
+        # Not an id we issued; replay from the start
+        last_id = 0
+    return StreamingResponse(
+        event_stream(request, job_id, job, last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/status/{job_id}/history")
+async def get_history(job_id: str):
+    """Every stage the job went through, oldest first."""
+    history = await asyncio.to_thread(STORE.history, job_id)
+    if not history:
+        raise HTTPException(status_code=404, detail="job not found")
+    return history
+
+
+@app.get("/api/trace/{job_id}")
+async def get_trace(job_id: str):
+    """The job's spans in OpenTelemetry JSON; spans still running end at the time of the request."""
+    trace = await asyncio.to_thread(TRACER.export, job_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="trace not found")
+    return trace
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+def accepted_encoding(request: Request, available: List[str]) -> Optional[str]:
+    """First of ``available`` the client accepts (Accept-Encoding, honouring q=0)."""
+    accepted = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = q
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def serve_artifact(request: Request, artifact: Artifact, media_type: str, download: bool = False,
+                   immutable: bool = False) -> Response:
+    """A report version with a strong ETag, 304 revalidation, precompressed encodings and byte ranges."""
+    headers = {
+        "Vary": "Accept-Encoding",
+        # Hash URLs never change; file-name URLs must revalidate, but that is a cheap 304
+        "Cache-Control": "public, max-age=31536000, immutable" if immutable else "no-cache",
+    }
+    if download:
+        headers["Content-Disposition"] = f'attachment; filename="{artifact.file}"'
+    etags = [t.strip().removeprefix("W/") for t in request.headers.get("if-none-match", "").split(",")]
+    if "*" in etags or any(t.startswith(f'"{artifact.sha256}') for t in etags):
+        return Response(status_code=304, headers={**headers, "ETag": artifact.etag})
+
+    path = ARTIFACTS.blob_path(artifact.sha256)
+    # Ranges refer to the plain report, so only whole-file responses are compressed
+    encoding = None
+    if "range" not in request.headers:
+        available = [e for e in ARTIFACTS.encodings() if ARTIFACTS.blob_path(artifact.sha256, e).exists()]
+        encoding = accepted_encoding(request, available)
+    if encoding:
+        path = ARTIFACTS.blob_path(artifact.sha256, encoding)
+        # Each encoding is its own representation and gets its own strong ETag
+        headers.update({"Content-Encoding": encoding, "ETag": f'"{artifact.sha256}-{encoding}"'})
+    else:
+        headers["ETag"] = artifact.etag
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@app.get("/api/artifacts/{sha256}")
+async def get_artifact(sha256: str, request: Request, download: bool = False):
+    """One report version by content hash; cacheable forever."""
+    artifact = await asyncio.to_thread(ARTIFACTS.get, sha256)
+    if not artifact:
+        raise HTTPException(status_code=404, detail="artifact not found")
+    return serve_artifact(request, artifact, "text/markdown; charset=utf-8", download=download, immutable=True)
+
+
+@app.get("/api/reports/{company}")
+async def report_versions(company: str):
+    """Every stored version of a company's report, newest first."""
+    versions = await asyncio.to_thread(ARTIFACTS.versions, company)
+    if not versions:
+        raise HTTPException(status_code=404, detail="no reports for this company")
+    return [v.to_dict() for v in versions]
 
 
 @app.get("/api/download/{filename}")
-async def download_file(filename: str):
+async def download_file(filename: str, request: Request):
+    artifact = await asyncio.to_thread(ARTIFACTS.latest_file, filename)
+    if artifact:
+        return serve_artifact(request, artifact, "text/markdown; charset=utf-8", download=True)
+    # Reports written before the artifact store existed
     file_path = OUTPUT_DIR / filename
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="file not found")
@@ -104,11 +424,14 @@ async def download_file(filename: str):
 
 
 @app.get("/api/output/{filename}")
-async def view_file(filename: str):
+async def view_file(filename: str, request: Request):
+    artifact = await asyncio.to_thread(ARTIFACTS.latest_file, filename)
+    if artifact:
+        return serve_artifact(request, artifact, "text/plain; charset=utf-8")
     file_path = OUTPUT_DIR / filename
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="file not found")
-    return PlainTextResponse(file_path.read_text(encoding="utf-8"))
+    return FileResponse(file_path, media_type="text/plain; charset=utf-8")
 
 
 app.mount("/", StaticFiles(directory=str(STATIC_DIR), html=True), name="static")
@@ -0,0 +1,176 @@
+import asyncio
+import atexit
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+from playwright.async_api import async_playwright
+from my_first_crew.tracing import span
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/116.0.0.0 Safari/537.36"
+)
+
+POOL_SIZE = int(os.getenv("CRAWLER_POOL_SIZE", "4"))
+MAX_USES_PER_CONTEXT = int(os.getenv("CRAWLER_CONTEXT_MAX_USES", "25"))
+
+
+class _Slot:
+    """A browser context with one reusable page."""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class BrowserPool:
+    """Long-lived Chromium shared by every crawl in the process.
+
+    Playwright objects are bound to the event loop that created them, so the
+    pool owns a background loop and all crawl coroutines are submitted to it
+    with ``run``. Up to ``size`` contexts are handed out at once; each one is
+    closed and replaced after ``max_uses`` page loads.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, max_uses: int = MAX_USES_PER_CONTEXT, headless: bool = True):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.headless = headless
+        self.launches = 0
+
+        self._playwright = None
+        self._browser = None
+        self._idle: list[_Slot] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run ``coro`` on the pool's loop and block until it finishes."""
+        if self._closed:
+            coro.close()
+            raise RuntimeError("Browser pool has been shut down")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _ensure_browser(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._start_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            # Browser crashed or was never started: drop stale contexts and relaunch
+            self._idle.clear()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            with span("browser.launch", relaunch=self.launches > 0):
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self.launches += 1
+            return self._browser
+
+    async def _new_slot(self) -> _Slot:
+        browser = await self._ensure_browser()
+        context = await browser.new_context(
+            user_agent=USER_AGENT,
+            viewport={"width": 1280, "height": 720},
+        )
+        await context.add_init_script(
+            "Object.defineProperty(navigator, 'webdriver', {get: () => false});"
+        )
+        page = await context.new_page()
+        return _Slot(context, page)
+
+    async def _discard(self, slot: _Slot):
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page; it goes back to the pool (or is recycled) on exit."""
+        await self._ensure_browser()
+        await self._slots.acquire()
+        slot = None
+        try:
+            while self._idle and slot is None:
+                candidate = self._idle.pop()
+                if candidate.page.is_closed():
+                    await self._discard(candidate)
+                else:
+                    slot = candidate
+            if slot is None:
+                slot = await self._new_slot()
+
+            healthy = False
+            try:
+                yield slot.page
+                healthy = True
+            finally:
+                slot.uses += 1
+                if healthy and slot.uses < self.max_uses and not self._closed and not slot.page.is_closed():
+                    self._idle.append(slot)
+                else:
+                    await self._discard(slot)
+        finally:
+            self._slots.release()
+
+    async def _close(self):
+        while self._idle:
+            await self._discard(self._idle.pop())
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def shutdown(self, timeout: float = 10):
+        """Close every context and the browser, then stop the loop thread."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = BrowserPool()
+        return _pool
+
+
+def shutdown_browser_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+atexit.register(shutdown_browser_pool)
@@ -0,0 +1,181 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+CACHE_DIR = Path(os.getenv("CACHE_DIR", ".cache"))
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    value: Any
+    meta: Dict[str, Any] = field(default_factory=dict)
+    stored_at: float = 0.0
+    fresh: bool = True
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class DiskCache:
+    """Small SQLite-backed key/value cache with a TTL and size-bounded LRU eviction.
+
+    Values and metadata are stored as JSON. Entries older than ``ttl`` seconds are
+    still returned by ``get`` (marked ``fresh=False``) so callers can revalidate
+    them; ``touch`` marks an entry fresh again without rewriting it. When the
+    total stored size exceeds ``max_bytes`` the least recently used entries go.
+    """
+
+    def __init__(self, path: Path, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, meta TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, meta, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+        value, meta, stored_at = row
+        entry = CacheEntry(key=key, value=json.loads(value), meta=json.loads(meta), stored_at=stored_at)
+        entry.fresh = self.ttl is None or entry.age < self.ttl
+        if entry.fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def set(self, key: str, value: Any, meta: Optional[Dict[str, Any]] = None):
+        value_json = json.dumps(value)
+        meta_json = json.dumps(meta or {})
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, meta, stored_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value_json, meta_json, now, now, len(value_json) + len(meta_json)),
+            )
+            self._evict()
+            self._db.commit()
+
+    def touch(self, key: str):
+        """Reset an entry's age, e.g. after the origin confirmed it is unchanged."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._db.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def _evict(self):
+        if not self.max_bytes:
+            return
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share one in-flight computation."""
+
+    def __init__(self):
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+_caches: Dict[str, DiskCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, ttl: Optional[float] = None, max_bytes: Optional[int] = None) -> DiskCache:
+    """Return the process-wide cache stored at ``CACHE_DIR/<name>.sqlite``."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = DiskCache(CACHE_DIR / f"{name}.sqlite", ttl=ttl, max_bytes=max_bytes)
+        return _caches[name]
+
+
+CRAWL_CACHE_TTL = float(os.getenv("CRAWL_CACHE_TTL", str(3 * 24 * 3600)))
+CRAWL_CACHE_MAX_MB = float(os.getenv("CRAWL_CACHE_MAX_MB", "200"))
+
+
+def get_crawl_cache() -> DiskCache:
+    return get_cache("crawl", ttl=CRAWL_CACHE_TTL, max_bytes=int(CRAWL_CACHE_MAX_MB * 1024 * 1024))
+
+
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(12 * 3600)))
+SEARCH_CACHE_MAX_MB = float(os.getenv("SEARCH_CACHE_MAX_MB", "50"))
+
+
+def get_search_cache() -> DiskCache:
+    return get_cache("search", ttl=SEARCH_CACHE_TTL, max_bytes=int(SEARCH_CACHE_MAX_MB * 1024 * 1024))
@@ -0,0 +1,138 @@
+import math
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List
+from my_first_crew.tools.crawl_result import PageResult
+from my_first_crew.tools.text import estimate_tokens, words
+
+TOKEN_BUDGET = int(os.getenv("CRAWLER_TOKEN_BUDGET", "12000"))
+CHUNK_TOKENS = int(os.getenv("CRAWLER_CHUNK_TOKENS", "200"))
+DEFAULT_FOCUS = (
+    "products product services service features pricing plans solutions platform "
+    "capabilities customers use cases launch release enterprise"
+)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "to", "was", "were", "will", "with", "you", "your",
+    "we", "our", "this", "can",
+}
+
+
+@dataclass
+class Chunk:
+    url: str
+    index: int
+    text: str
+    tokens: int
+    score: float = 0.0
+
+
+@dataclass
+class CompressedOutput:
+    text: str
+    kept: List[Chunk] = field(default_factory=list)
+    dropped: List[Chunk] = field(default_factory=list)
+
+    @property
+    def kept_tokens(self) -> int:
+        return sum(c.tokens for c in self.kept)
+
+    @property
+    def dropped_tokens(self) -> int:
+        return sum(c.tokens for c in self.dropped)
+
+    def manifest(self) -> str:
+        """One line per page that lost chunks, so the agent knows what it is not seeing."""
+        per_page = {}
+        for c in self.dropped:
+            count, tokens = per_page.get(c.url, (0, 0))
+            per_page[c.url] = (count + 1, tokens + c.tokens)
+        if not per_page:
+            return ""
+        lines = [f"--- Omitted to fit the {self.kept_tokens + self.dropped_tokens}-token crawl into budget ---"]
+        for url, (count, tokens) in per_page.items():
+            lines.append(f"- {url}: {count} chunk(s), ~{tokens} tokens")
+        return "\n".join(lines)
+
+
+def chunk_page(page: PageResult, chunk_tokens: int = CHUNK_TOKENS) -> List[Chunk]:
+    """Split a page into chunks of whole paragraphs of about ``chunk_tokens`` each."""
+    chunks: List[Chunk] = []
+    current: List[str] = []
+    size = 0
+    for paragraph in (p.strip() for p in page.text.split("\n")):
+        if not paragraph:
+            continue
+        tokens = estimate_tokens(paragraph)
+        if current and size + tokens > chunk_tokens:
+            text = "\n\n".join(current)
+            chunks.append(Chunk(page.url, len(chunks), text, estimate_tokens(text)))
+            current, size = [], 0
+        current.append(paragraph)
+        size += tokens
+    if current:
+        text = "\n\n".join(current)
+        chunks.append(Chunk(page.url, len(chunks), text, estimate_tokens(text)))
+    return chunks
+
+
+def bm25_scores(chunks: List[Chunk], query: str, k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 of every chunk against ``query``."""
+    docs = [[w for w in words(c.text) if w not in STOPWORDS] for c in chunks]
+    terms = [w for w in dict.fromkeys(words(query)) if w not in STOPWORDS]
+    if not docs or not terms:
+        return [0.0] * len(chunks)
+    avg_len = sum(len(d) for d in docs) / len(docs) or 1.0
+    df = Counter(t for d in docs for t in set(d))
+    n = len(docs)
+    scores = []
+    for doc in docs:
+        tf = Counter(doc)
+        score = 0.0
+        for term in terms:
+            if not tf[term]:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def compress_pages(pages: List[PageResult], query: str = DEFAULT_FOCUS, token_budget: int = TOKEN_BUDGET,
+                   chunk_tokens: int = CHUNK_TOKENS) -> CompressedOutput:
+    """Keep the chunks most relevant to ``query`` that fit in ``token_budget``.
+
+    Kept chunks are emitted in their original page order so the text still
+    reads naturally; everything else is listed in the manifest.
+    """
+    chunks = [c for page in pages for c in chunk_page(page, chunk_tokens)]
+    for chunk, score in zip(chunks, bm25_scores(chunks, query)):
+        chunk.score = score
+
+    kept_ids = set()
+    used = 0
+    for chunk in sorted(chunks, key=lambda c: c.score, reverse=True):
+        if used + chunk.tokens > token_budget:
+            continue
+        kept_ids.add(id(chunk))
+        used += chunk.tokens
+
+    output = CompressedOutput(text="")
+    blocks = []
+    current_url = None
+    for chunk in chunks:
+        if id(chunk) not in kept_ids:
+            output.dropped.append(chunk)
+            continue
+        output.kept.append(chunk)
+        if chunk.url != current_url:
+            page = next(p for p in pages if p.url == chunk.url)
+            blocks.append(f"--- Content from {chunk.url} [{page.tier}] ---")
+            current_url = chunk.url
+        blocks.append(chunk.text + "\n")
+
+    manifest = output.manifest()
+    output.text = "\n".join(blocks) + ("\n" + manifest + "\n" if manifest else "")
+    return output
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict
+from urllib.parse import urlsplit
+from my_first_crew.tools.crawl_result import PageResult
+from my_first_crew.tools.frontier import Frontier, FrontierItem
+
+MAX_CONCURRENCY = int(os.getenv("CRAWLER_MAX_CONCURRENCY", "4"))
+PER_HOST_CONCURRENCY = int(os.getenv("CRAWLER_PER_HOST_CONCURRENCY", "2"))
+TIME_BUDGET = float(os.getenv("CRAWLER_TIME_BUDGET", "90"))
+TARGET_TEXT_CHARS = int(os.getenv("CRAWLER_TARGET_CHARS", "60000"))
+
+Fetcher = Callable[[str], Awaitable[PageResult]]
+
+
+class CrawlEngine:
+    """Fetches many URLs concurrently within global, per-host and time limits.
+
+    ``fetch`` is awaited once per URL and returns a ``PageResult``.
+    The crawl stops early once ``target_chars`` of text have been collected or
+    ``time_budget`` seconds have passed; in-flight fetches are cancelled.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetcher,
+        max_concurrency: int = MAX_CONCURRENCY,
+        per_host: int = PER_HOST_CONCURRENCY,
+        time_budget: float = TIME_BUDGET,
+        target_chars: int = TARGET_TEXT_CHARS,
+    ):
+        self.fetch = fetch
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host = max(1, per_host)
+        self.time_budget = time_budget
+        self.target_chars = target_chars
+
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._collected = 0
+        self._active = 0
+        self._done = None
+        self._changed = None
+        self._items: Dict[str, FrontierItem] = {}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def _worker(self, frontier: Frontier, results: Dict[str, PageResult]):
+        while not self._done.is_set():
+            item = frontier.pop()
+            if item is None:
+                # Nothing queued: finish unless an in-flight page may still add links
+                if self._active == 0:
+                    self._changed.set()
+                    return
+                self._changed.clear()
+                await self._changed.wait()
+                continue
+
+            self._items[item.url] = item
+            self._active += 1
+            try:
+                async with self._host_limit(item.url):
+                    if self._done.is_set():
+                        return
+                    started = time.perf_counter()
+                    try:
+                        page = await self.fetch(item.url)
+                    except asyncio.CancelledError:
+                        results[item.url] = PageResult(url=item.url, status="skipped")
+                        raise
+                    except Exception as e:
+                        page = PageResult(url=item.url, status="error", elapsed=time.perf_counter() - started,
+                                          error=f"{type(e).__name__}: {e}")
+            finally:
+                self._active -= 1
+
+            results[item.url] = page
+            if page.status == "ok" and page.text:
+                self._collected += len(page.text)
+                if self.target_chars and self._collected >= self.target_chars:
+                    self._done.set()
+            if item.depth < frontier.max_depth:
+                frontier.add_all(page.links, depth=item.depth + 1)
+            self._changed.set()
+
+    async def crawl(self, frontier: Frontier) -> Dict[str, PageResult]:
+        """Crawl the frontier and return ``{url: PageResult}`` by depth, then relevance, then URL.
+
+        Links found on fetched pages are fed back into the frontier until its
+        page or depth budget is exhausted. The order never depends on which
+        fetch finished first, so the same site always renders the same text.
+        """
+        self._done = asyncio.Event()
+        self._changed = asyncio.Event()
+        self._collected = 0
+        self._active = 0
+        self._items = {}
+
+        results: Dict[str, PageResult] = {}
+        if not len(frontier):
+            return results
+
+        workers = [asyncio.ensure_future(self._worker(frontier, results)) for _ in range(self.max_concurrency)]
+        stop = asyncio.ensure_future(self._done.wait())
+        started = time.monotonic()
+        try:
+            pending = set(workers)
+            while pending and not self._done.is_set():
+                timeout = None
+                if self.time_budget:
+                    timeout = self.time_budget - (time.monotonic() - started)
+                    if timeout <= 0:
+                        break
+                _, pending = await asyncio.wait(pending | {stop}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                pending.discard(stop)
+        finally:
+            stop.cancel()
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        items = self._items
+        order = sorted(results, key=lambda url: (items[url].depth, -items[url].score, url))
+        return {url: results[url] for url in order}
@@ -0,0 +1,58 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class PageResult:
+    """Outcome of fetching a single URL."""
+    url: str
+    text: str = ""
+    status: str = "ok"  # ok | empty | error | skipped
+    tier: str = ""  # http | browser, whichever produced the text
+    cache: str = ""  # hit | revalidated | miss, empty when caching is off
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    links: List[List[str]] = field(default_factory=list, repr=False)  # [href, anchor text]
+    raw_text: str = field(default="", repr=False)  # text as extracted, before cross-page dedup rewrote it
+
+    @property
+    def bytes(self) -> int:
+        return len(self.text.encode("utf-8"))
+
+
+@dataclass
+class CrawlResult:
+    """Everything one crawl collected, kept in memory so crawls never share state."""
+    start_url: str
+    pages: List[PageResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    dedup: Optional[dict] = None  # DedupStats.to_dict() once duplicates were removed
+
+    @property
+    def ok_pages(self) -> List[PageResult]:
+        return [p for p in self.pages if p.status == "ok" and p.text]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(p.bytes for p in self.pages)
+
+    def to_text(self, pages: Optional[List[PageResult]] = None) -> str:
+        """Render the crawl (or just ``pages`` of it) the way the agent reads it: one block per page."""
+        pages = self.ok_pages if pages is None else pages
+        return "".join(f"--- Content from {p.url} [{p.tier}] ---\n{p.text}\n\n" for p in pages)
+
+    def summary(self) -> dict:
+        tiers: dict = {}
+        for p in self.ok_pages:
+            tiers[p.tier] = tiers.get(p.tier, 0) + 1
+        return {
+            "start_url": self.start_url,
+            "elapsed": round(self.elapsed, 3),
+            "pages": len(self.pages),
+            "ok": len(self.ok_pages),
+            "bytes": self.total_bytes,
+            "tiers": tiers,
+            "cache_hits": sum(1 for p in self.pages if p.cache in ("hit", "revalidated")),
+            "dedup": self.dedup,
+            "served_by": {p.url: p.tier for p in self.ok_pages},
+        }
@@ -1,9 +1,25 @@
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from crewai.tools import BaseTool
-from typing import Type
+from typing import List, Optional, Type
 from pydantic import BaseModel, Field
 from crewai_tools import SerperDevTool
-import asyncio
 from my_first_crew.tools.tool import scrape_text_and_links
+from my_first_crew.tools.browser_pool import get_browser_pool
+from my_first_crew.tools.cache import SingleFlight, get_crawl_cache, get_search_cache
+from my_first_crew.tools.frontier import Frontier, MAX_DEPTH, MAX_PAGES
+from my_first_crew.tools.compress import DEFAULT_FOCUS, TOKEN_BUDGET, compress_pages
+from my_first_crew.tools.text import estimate_tokens
+from my_first_crew.rate_limit import call_with_retry, get_limiter
+from my_first_crew.metrics import METRICS
+from my_first_crew.scheduler import check_cancelled
+from my_first_crew.tracing import annotate, span
+from my_first_crew.incremental import SourceLedger, filter_search_results
 
 class CrawlWebsiteInput(BaseModel):
     """Input schema for crawl_website tool."""
@@ -16,18 +32,61 @@ class CrawlWebsiteTool(BaseTool):
         "Extracts useful text content from a competitor's Product and Services pages."
     )
     args_schema: Type[BaseModel] = CrawlWebsiteInput
+    use_cache: bool = Field(default=True, description="Serve pages from the on-disk crawl cache when possible.")
+    max_pages: int = Field(default=MAX_PAGES, description="Most pages fetched per crawl besides the start page.")
+    max_depth: int = Field(default=MAX_DEPTH, description="How many links away from the start page to follow.")
+    token_budget: int = Field(default=TOKEN_BUDGET, description="Most tokens of page text returned; 0 returns everything.")
+    focus: str = Field(default=DEFAULT_FOCUS, description="Terms used to rank page chunks when trimming to the budget.")
+    ledger: Optional[SourceLedger] = Field(default=None, exclude=True, description="Fingerprints of pages behind the last report.")
 
     def _run(self, url: str) -> str:
-        asyncio.run(scrape_text_and_links(url))
-        with open("page_text.txt", "r", encoding="utf-8") as f:
-            all_text = f.read()
-        return all_text
+        check_cancelled()
+        cache = get_crawl_cache() if self.use_cache else None
+        frontier = Frontier(max_pages=self.max_pages, max_depth=self.max_depth)
+        result = get_browser_pool().run(scrape_text_and_links(url, cache=cache, frontier=frontier))
+        for page in result.pages:
+            METRICS.record_page(page.tier, page.status, page.cache or "off", page.elapsed, page.bytes)
+        summary = result.summary()
+
+        pages, unchanged = result.ok_pages, []
+        if self.ledger is not None:
+            # Fingerprint what the site served, not what survived dedup against the other pages
+            changed = [self.ledger.record("page", p.url, p.raw_text or p.text) for p in pages]
+            if self.ledger.active:
+                # Pages identical to the last report's add nothing new; the summarizer already has them
+                unchanged = [p.url for p, c in zip(pages, changed) if not c]
+                pages = [p for p, c in zip(pages, changed) if c]
+                summary["unchanged"] = len(unchanged)
+
+        text = result.to_text(pages)
+        if self.token_budget and estimate_tokens(text) > self.token_budget:
+            compressed = compress_pages(pages, self.focus, self.token_budget)
+            summary["compression"] = {"kept_tokens": compressed.kept_tokens, "dropped_tokens": compressed.dropped_tokens}
+            text = compressed.text
+        if unchanged:
+            text += "--- Unchanged since the last report ---\n" + "\n".join(unchanged) + "\n"
+        logging.info(f"Crawl summary: {summary}")
+        annotate(pages=len(result.pages), pages_ok=len(result.ok_pages), unchanged=len(unchanged) or None,
+                 text_bytes=len(text.encode("utf-8")))
+        return text
+
+
+# Serper endpoint, e.g. a proxy or a local stand-in for offline benchmarks
+SERPER_BASE_URL = os.getenv("SERPER_BASE_URL", "https://google.serper.dev")
 
 
 class FlexibleSerperDevInput(BaseModel):
     """Input schema for FlexibleSerperDevTool."""
     search_query: str = Field(..., description="The search query to search for information on the web")
 
+_search_flight = SingleFlight()
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop surrounding punctuation and collapse whitespace."""
+    return re.sub(r"\s+", " ", query.lower()).strip(" \t\n\"'.,;:!?")
+
+
 class FlexibleSerperDevTool(SerperDevTool):  
     name: str = "FlexibleSerperDevTool"
     description: str = (
@@ -35,6 +94,108 @@ class FlexibleSerperDevTool(SerperDevTool):
         "facts, or recent data. Invoke it only when current or external information is needed."
     )
     args_schema: Type[BaseModel] = FlexibleSerperDevInput
-    
+    base_url: str = Field(default=SERPER_BASE_URL, description="Serper API endpoint.")
+    use_cache: bool = Field(default=True, description="Serve repeated queries from the on-disk search cache.")
+    ledger: Optional[SourceLedger] = Field(default=None, exclude=True, description="Fingerprints of results behind the last report.")
+
+    def _cache_key(self, search_query: str) -> str:
+        params = [normalize_query(search_query), self.search_type, self.n_results,
+                  self.country, self.location, self.locale]
+        return hashlib.sha1(json.dumps(params).encode("utf-8")).hexdigest()
+
+    def _search(self, search_query: str) -> dict:
+        run = super()._run
+        return call_with_retry(get_limiter("serper"), lambda: run(search_query=search_query))
+
     def _run(self, search_query: str) -> dict:
-        return super()._run(search_query=search_query)
\ No newline at end of file
+        with span("search", query=search_query, search_type=self.search_type):
+            return filter_search_results(self._lookup(search_query), self.ledger)
+
+    def _lookup(self, search_query: str) -> dict:
+        if not self.use_cache:
+            self._count_search("off")
+            return self._search(search_query)
+
+        cache = get_search_cache()
+        key = self._cache_key(search_query)
+        entry = cache.get(key)
+        if entry and entry.fresh:
+            self._count_search("hit")
+            return entry.value
+
+        # Identical queries issued concurrently (e.g. by parallel jobs) share one request
+        led = []
+
+        def fetch():
+            led.append(True)
+            results = self._search(search_query)
+            cache.set(key, results)
+            return results
+
+        try:
+            return _search_flight.do(key, fetch)
+        finally:
+            self._count_search("miss" if led else "coalesced")
+
+    @staticmethod
+    def _count_search(outcome: str):
+        annotate(cache=outcome)
+        METRICS.record_search(outcome)
+
+
+class BatchSerperDevInput(BaseModel):
+    """Input schema for BatchSerperDevTool."""
+    search_queries: List[str] = Field(..., description="All the search queries to run at once, e.g. one per research topic")
+
+
+class BatchSerperDevTool(BaseTool):
+    name: str = "BatchSerperDevTool"
+    description: str = (
+        "Run several web searches in one step. Pass every query you need (mission, products, financials, "
+        "partnerships, controversies, ...) as a list and get back merged, de-duplicated results."
+    )
+    args_schema: Type[BaseModel] = BatchSerperDevInput
+    max_queries: int = Field(default=10, description="Most queries run per call; extra queries are ignored.")
+    max_workers: int = Field(default=5, description="Queries sent to Serper at the same time.")
+    search: FlexibleSerperDevTool = Field(default_factory=FlexibleSerperDevTool, exclude=True)
+    ledger: Optional[SourceLedger] = Field(default=None, exclude=True, description="Fingerprints of results behind the last report.")
+
+    def _run(self, search_queries: List[str]) -> dict:
+        if isinstance(search_queries, str):
+            search_queries = [search_queries]
+        queries = list(dict.fromkeys(q.strip() for q in search_queries if q and q.strip()))[:self.max_queries]
+
+        # Each query still goes through the single-query cache and in-flight coalescing
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(queries) or 1))) as pool:
+            # Copy the caller's context so each search is traced under the tool call that asked for it
+            futures = {q: pool.submit(contextvars.copy_context().run, self.search._run, q) for q in queries}
+
+        merged = {"queries": queries, "organic": [], "news": [], "peopleAlsoAsk": [], "knowledgeGraph": []}
+        seen_links = set()
+        seen_questions = set()
+        errors = {}
+        for query, future in futures.items():
+            try:
+                results = future.result()
+            except Exception as e:
+                errors[query] = f"{type(e).__name__}: {e}"
+                continue
+            for key in ("organic", "news"):
+                for item in results.get(key, []):
+                    link = item.get("link")
+                    if link and link in seen_links:
+                        continue
+                    seen_links.add(link)
+                    merged[key].append({**item, "query": query})
+            for item in results.get("peopleAlsoAsk", []):
+                question = item.get("question")
+                if question not in seen_questions:
+                    seen_questions.add(question)
+                    merged["peopleAlsoAsk"].append(item)
+            if results.get("knowledgeGraph"):
+                merged["knowledgeGraph"].append(results["knowledgeGraph"])
+
+        merged = filter_search_results({k: v for k, v in merged.items() if v}, self.ledger)
+        if errors:
+            merged["errors"] = errors
+        return merged
@@ -0,0 +1,110 @@
+import hashlib
+import re
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Set
+from my_first_crew.tools.crawl_result import PageResult
+from my_first_crew.tools.text import estimate_tokens, normalize_text, words
+
+SIMHASH_BITS = 64
+# Paragraphs are short, so single-word shingles keep one-word edits within a few bits
+# while unrelated paragraphs land 20+ bits apart; longer shingles spread edits too far.
+SHINGLE_SIZE = 1
+# Paragraphs with fewer words than this only get exact matching; SimHash is noisy on them
+MIN_WORDS_FOR_SIMHASH = 8
+MAX_HAMMING_DISTANCE = 6
+BANDS = 8  # pigeonhole: distance <= 7 means at least one 8-bit band matches exactly
+EXTRA_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+@dataclass
+class DedupStats:
+    paragraphs: int = 0
+    exact_removed: int = 0
+    near_removed: int = 0
+    bytes_removed: int = 0
+    tokens_removed: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: List[str], shingle_size: int = SHINGLE_SIZE) -> int:
+    """64-bit SimHash over word shingles."""
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = _hash64(shingle)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def _bands(fingerprint: int) -> List[int]:
+    width = SIMHASH_BITS // BANDS
+    mask = (1 << width) - 1
+    return [(i << width) | (fingerprint >> (i * width) & mask) for i in range(BANDS)]
+
+
+class ParagraphDeduplicator:
+    """Remembers every paragraph it has kept and rejects exact or near repeats."""
+
+    def __init__(self, max_distance: int = MAX_HAMMING_DISTANCE):
+        self.max_distance = max_distance
+        self.stats = DedupStats()
+        self._exact: Set[str] = set()
+        self._bands: Dict[int, List[int]] = {}
+
+    def is_duplicate(self, paragraph: str) -> bool:
+        normalized = normalize_text(paragraph)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        if digest in self._exact:
+            self.stats.exact_removed += 1
+            return True
+        self._exact.add(digest)
+
+        tokens = words(normalized)
+        if len(tokens) < MIN_WORDS_FOR_SIMHASH:
+            return False
+        fingerprint = simhash(tokens)
+        bands = _bands(fingerprint)
+        for band in bands:
+            for other in self._bands.get(band, ()):
+                if bin(fingerprint ^ other).count("1") <= self.max_distance:
+                    self.stats.near_removed += 1
+                    return True
+        for band in bands:
+            self._bands.setdefault(band, []).append(fingerprint)
+        return False
+
+    def filter_text(self, text: str) -> str:
+        kept = []
+        for line in text.split("\n"):
+            if not line.strip():
+                kept.append(line)
+                continue
+            self.stats.paragraphs += 1
+            if self.is_duplicate(line):
+                self.stats.bytes_removed += len(line.encode("utf-8"))
+                self.stats.tokens_removed += estimate_tokens(line)
+            else:
+                kept.append(line)
+        return EXTRA_BLANK_LINES.sub("\n\n", "\n".join(kept)).strip()
+
+
+def dedup_pages(pages: List[PageResult], max_distance: int = MAX_HAMMING_DISTANCE) -> DedupStats:
+    """Drop repeated paragraphs across ``pages`` in place, keeping first occurrences.
+
+    Each page's original text stays available as ``raw_text``.
+    """
+    dedup = ParagraphDeduplicator(max_distance)
+    for page in pages:
+        page.raw_text = page.raw_text or page.text
+        page.text = dedup.filter_text(page.text)
+    return dedup.stats
@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+from urllib.parse import parse_qsl, urlsplit
+from my_first_crew.tools.urls import normalize_url
+
+MAX_PAGES = int(os.getenv("CRAWLER_MAX_PAGES", "30"))
+MAX_DEPTH = int(os.getenv("CRAWLER_MAX_DEPTH", "2"))
+
+# Path / anchor keywords that point at pages worth feeding into the report
+RELEVANT = {
+    "product": 3, "products": 3, "service": 3, "services": 3, "solution": 3, "solutions": 3,
+    "feature": 2, "features": 2, "platform": 2, "pricing": 2, "plans": 2, "offering": 2,
+    "offerings": 2, "capabilities": 2, "use-cases": 1, "industries": 1, "enterprise": 1,
+    "business": 1, "customers": 1, "overview": 1, "api": 1, "models": 1,
+}
+IRRELEVANT = {
+    "login": -6, "signin": -6, "sign-in": -6, "signup": -4, "sign-up": -4, "register": -4,
+    "account": -4, "auth": -6, "logout": -6, "legal": -5, "privacy": -5, "terms": -5,
+    "cookie": -5, "cookies": -5, "policy": -4, "policies": -4, "careers": -5, "career": -5,
+    "jobs": -5, "job": -4, "status": -3, "help": -2, "support": -2, "contact": -2,
+    "investor": -2, "investors": -2, "press-kit": -3, "brand": -3, "sitemap": -3,
+    "search": -3, "tag": -2, "author": -2,
+}
+SKIP_EXTENSIONS = re.compile(
+    r"\.(pdf|png|jpe?g|gif|svg|webp|ico|zip|gz|tar|mp4|mp3|mov|avi|css|js|json|xml|rss|woff2?|ttf|exe|dmg)$",
+    re.I,
+)
+# /fr/, /de-de/, /pt_BR/ ... English variants are treated as the default locale
+LOCALE_SEGMENT = re.compile(r"^([a-z]{2})([-_][a-z]{2,4})?$", re.I)
+LANGUAGES = {
+    "ar", "bg", "cs", "da", "de", "el", "es", "et", "fi", "fr", "he", "hi", "hr", "hu", "id",
+    "it", "ja", "ko", "lt", "lv", "ms", "nb", "nl", "no", "pl", "pt", "ro", "ru", "sk", "sl",
+    "sr", "sv", "th", "tr", "uk", "vi", "zh",
+}
+LOCALE_PARAMS = {"lang", "locale", "hl", "lng"}
+WORD = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+Link = Union[str, Sequence[str]]
+
+
+@dataclass(order=True)
+class FrontierItem:
+    priority: float
+    order: int
+    url: str = field(compare=False)
+    depth: int = field(compare=False, default=1)
+    score: float = field(compare=False, default=0.0)
+    anchor: str = field(compare=False, default="")
+
+
+def _keyword_score(words: Iterable[str], weight: float) -> float:
+    total = 0.0
+    for word in words:
+        total += RELEVANT.get(word, 0) * weight
+        total += IRRELEVANT.get(word, 0) * weight
+    return total
+
+
+def url_locale(url: str) -> Optional[str]:
+    """Language a URL is localized to by path prefix or query parameter; None for English/unprefixed."""
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s]
+    match = LOCALE_SEGMENT.match(segments[0]) if segments else None
+    if match and match.group(1).lower() in LANGUAGES:
+        return match.group(1).lower()
+    for key, value in parse_qsl(parts.query):
+        if key.lower() in LOCALE_PARAMS and value[:2].lower() != "en":
+            return value[:2].lower() or None
+    return None
+
+
+def is_locale_variant(url: str, locale: Optional[str] = None) -> bool:
+    """True for a page localized to another language than ``locale``, the one the crawl started in."""
+    variant = url_locale(url)
+    return variant is not None and variant != locale
+
+
+def score_link(url: str, anchor: str = "", depth: int = 1, locale: Optional[str] = None) -> Optional[float]:
+    """Relevance of a link for product/service research, or None to drop it."""
+    parts = urlsplit(url)
+    if SKIP_EXTENSIONS.search(parts.path) or is_locale_variant(url, locale):
+        return None
+    path_words = WORD.findall(parts.path.lower())
+    anchor_words = WORD.findall(anchor.lower())
+    score = _keyword_score(path_words, 1.0) + _keyword_score(anchor_words, 0.5)
+    if any(IRRELEVANT.get(w, 0) <= -5 for w in path_words):
+        return None
+    # Shallow paths are usually overview pages; long ones are deep articles
+    score -= 0.25 * max(0, len([s for s in parts.path.split("/") if s]) - 2)
+    score -= 0.5 * max(0, depth - 1)
+    return score
+
+
+class Frontier:
+    """Priority queue of URLs to crawl with canonical dedup and a page/depth budget.
+
+    ``locale`` is the language of the start page (None for English); pages
+    localized to any other language are dropped.
+    """
+
+    def __init__(self, max_pages: int = MAX_PAGES, max_depth: int = MAX_DEPTH,
+                 accept: Optional[Callable[[str], bool]] = None, locale: Optional[str] = None):
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.accept = accept
+        self.locale = locale
+        self.seen: set = set()
+        self.dropped = 0
+        self.handed_out = 0
+        self._heap: List[FrontierItem] = []
+        self._counter = itertools.count()
+
+    def mark_seen(self, url: str):
+        self.seen.add(normalize_url(url))
+
+    def add(self, link: Link, depth: int = 1) -> bool:
+        """Queue a link (a URL or ``(url, anchor_text)``); returns False if it was dropped."""
+        if isinstance(link, str):
+            url, anchor = link, ""
+        else:
+            url, anchor = link[0], (link[1] if len(link) > 1 else "") or ""
+        if not url or not url.startswith("http") or depth > self.max_depth:
+            return False
+        key = normalize_url(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        if self.accept is not None and not self.accept(key):
+            self.dropped += 1
+            return False
+        score = score_link(key, anchor, depth, self.locale)
+        if score is None:
+            self.dropped += 1
+            return False
+        heapq.heappush(self._heap, FrontierItem(-score, next(self._counter), key, depth, score, anchor.strip()))
+        return True
+
+    def add_all(self, links: Iterable[Link], depth: int = 1) -> int:
+        return sum(1 for link in links if self.add(link, depth))
+
+    def pop(self) -> Optional[FrontierItem]:
+        """Next most relevant URL, or None once empty or the page budget is spent."""
+        if not self._heap or (self.max_pages and self.handed_out >= self.max_pages):
+            return None
+        self.handed_out += 1
+        return heapq.heappop(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
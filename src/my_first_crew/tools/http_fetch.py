@@ -0,0 +1,160 @@
+import asyncio
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from my_first_crew.tools.browser_pool import USER_AGENT
+
+HTTP_FIRST = os.getenv("CRAWLER_HTTP_FIRST", "1") != "0"
+HTTP_TIMEOUT = float(os.getenv("CRAWLER_HTTP_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.getenv("CRAWLER_HTTP_POOL_SIZE", "16"))
+
+# Same selectors the browser extractor uses, so both tiers produce comparable text
+UNWANTED_SELECTORS = [
+    "nav", "footer", "header", "aside",
+    ".sidebar", ".advertisement", ".ads", '[role="banner"]',
+    '[role="navigation"]', '[role="contentinfo"]',
+    "script", "style", "noscript",
+]
+CONTENT_SELECTOR = (
+    "main p, main h1, main h2, main h3, main h4, main li, main blockquote, "
+    "article p, article h1, article h2, article h3, article h4, article li, article blockquote, "
+    "body p, body h1, body h2, body h3, body h4, body li, body blockquote"
+)
+CONTENT_TAGS = ["p", "h1", "h2", "h3", "h4", "li", "blockquote"]
+APP_ROOT_SELECTOR = "#root, #app, #__next, #__nuxt, [data-reactroot], app-root"
+JS_REQUIRED = re.compile(r"(enable|requires?)\s+javascript", re.I)
+WHITESPACE = re.compile(r"\s+")
+
+_session: Optional[requests.Session] = None
+
+
+def get_session() -> requests.Session:
+    """Shared keep-alive session so repeated fetches reuse TCP/TLS connections."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        _session = session
+    return _session
+
+
+@dataclass
+class StaticPage:
+    """Text and links pulled from server-rendered HTML."""
+    url: str
+    status_code: int = 0
+    text: str = ""
+    body_text: str = ""
+    links: List[List[str]] = field(default_factory=list)
+    js_only: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+    error: Optional[str] = None
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        return {k: v for k, v in (("etag", self.etag), ("last_modified", self.last_modified)) if v}
+
+
+def looks_js_only(soup: BeautifulSoup, text: str, min_text_length: int) -> bool:
+    """True when the HTML is an empty shell that needs a browser to render."""
+    for noscript in soup.find_all("noscript"):
+        if JS_REQUIRED.search(noscript.get_text(" ")):
+            return len(text) < min_text_length * 5
+    for root in soup.select(APP_ROOT_SELECTOR):
+        if not root.get_text(strip=True):
+            return True
+    scripts = len(soup.find_all("script"))
+    return scripts > 10 and len(text) < min_text_length * 2
+
+
+def extract_static(url: str, html: str, min_text_length: int = 100) -> StaticPage:
+    soup = BeautifulSoup(html, "html.parser")
+
+    # (href, anchor text) pairs; the anchor text helps rank links for crawling
+    links = [
+        [urljoin(url, a["href"].strip()), WHITESPACE.sub(" ", a.get_text(" ")).strip()]
+        for a in soup.find_all("a", href=True)
+    ]
+    links = [link for link in links if link[0].startswith("http")]
+
+    js_only = looks_js_only(soup, soup.get_text(" ", strip=True), min_text_length)
+
+    # body_text mirrors document.body.innerText: everything visible, chrome included
+    for el in soup.select("script, style, noscript, template"):
+        el.decompose()
+    body_text = (soup.body or soup).get_text("\n", strip=True)
+
+    for selector in UNWANTED_SELECTORS:
+        for el in soup.select(selector):
+            el.decompose()
+
+    paragraphs = []
+    for el in soup.select(CONTENT_SELECTOR):
+        if el.find(CONTENT_TAGS):
+            continue
+        t = WHITESPACE.sub(" ", el.get_text(" ")).strip()
+        if t:
+            paragraphs.append(t)
+    text = "\n\n".join(paragraphs)
+
+    return StaticPage(url=url, text=text, body_text=body_text, links=links, js_only=js_only)
+
+
+def fetch_static(url: str, min_text_length: int = 100, validators: Optional[Dict[str, str]] = None) -> StaticPage:
+    """Fetch ``url`` over plain HTTP and extract its readable text.
+
+    ``validators`` (``etag`` / ``last_modified`` from an earlier fetch) turn the
+    request into a conditional GET; a 304 comes back as ``not_modified=True``.
+    """
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    try:
+        response = get_session().get(url, headers=headers, timeout=HTTP_TIMEOUT, allow_redirects=True)
+    except requests.RequestException as e:
+        return StaticPage(url=url, error=f"{type(e).__name__}: {e}")
+
+    if response.status_code == 304:
+        return StaticPage(url=url, status_code=304, not_modified=True, **_validators(response))
+
+    if response.status_code != 200:
+        return StaticPage(url=url, status_code=response.status_code, error=f"HTTP {response.status_code}")
+    content_type = response.headers.get("Content-Type", "")
+    if "html" not in content_type:
+        return StaticPage(url=url, status_code=response.status_code, error=f"unsupported content type {content_type!r}")
+
+    page = extract_static(response.url or url, response.text, min_text_length)
+    page.status_code = response.status_code
+    page.etag, page.last_modified = _validators(response).values()
+    return page
+
+
+def _validators(response: requests.Response) -> Dict[str, Optional[str]]:
+    return {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+
+async def fetch_static_async(url: str, min_text_length: int = 100, validators: Optional[Dict[str, str]] = None) -> StaticPage:
+    return await asyncio.to_thread(fetch_static, url, min_text_length, validators)
+
+
+def needs_browser(page: StaticPage, min_text_length: int = 100, landing: bool = False) -> bool:
+    """Whether the static result is too thin to use and Playwright should render the page."""
+    text = page.body_text if landing else page.text
+    return bool(page.error) or page.js_only or len(text) < min_text_length
@@ -1,31 +1,108 @@
-import asyncio
-from playwright.async_api import async_playwright
+import time
+from my_first_crew.tools.browser_pool import get_browser_pool
+from my_first_crew.tools.cache import DiskCache, CacheEntry
+from my_first_crew.tools.crawl_result import PageResult
+from my_first_crew.tools.http_fetch import HTTP_FIRST, fetch_static_async, needs_browser
+from my_first_crew.tools.urls import normalize_url
+from my_first_crew.tracing import annotate, span
 import nest_asyncio
 
 nest_asyncio.apply()
-with open("page_text.txt", "w", encoding="utf-8"): pass
-
-async def scrape_single_url(url: str, OUTPUT_FILE: str = "page_text.txt", MAX_RETRIES: int = 3, MIN_TEXT_LENGTH: int =100):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/116.0.0.0 Safari/537.36"
-            )
-        )
-        page = await context.new_page()
+
+LANDING_SCRIPT = """
+    () => ({
+        text: document.body.innerText,
+        links: Array.from(document.querySelectorAll('a')).map(el => [el.href, el.innerText.trim()]),
+    })
+"""
+
+
+def _from_cache(url: str, entry: CacheEntry, cache_status: str, started: float) -> PageResult:
+    return PageResult(
+        url=url, text=entry.value["text"], links=entry.value.get("links", []),
+        tier=entry.value.get("tier", ""), cache=cache_status, elapsed=time.perf_counter() - started,
+    )
+
+
+async def scrape_single_url(url: str, MAX_RETRIES: int = 3, MIN_TEXT_LENGTH: int =100,
+                            cache: DiskCache = None, landing: bool = False) -> PageResult:
+    """Scrape one page (see ``_scrape``), traced as a ``crawl.page`` span."""
+    with span("crawl.page", url=url, landing=landing):
+        result = await _scrape(url, MAX_RETRIES, MIN_TEXT_LENGTH, cache, landing)
+        annotate(status=result.status, tier=result.tier or None, cache=result.cache or None, error=result.error,
+                 bytes=len(result.text.encode("utf-8")), links=len(result.links))
+        return result
+
+
+async def _scrape(url: str, MAX_RETRIES: int, MIN_TEXT_LENGTH: int,
+                  cache: DiskCache, landing: bool) -> PageResult:
+    """Fetch ``url`` over plain HTTP, falling back to Chromium for thin or JS-only pages.
+
+    With a ``cache``, fresh entries are returned without any network call and
+    stale ones are revalidated with a conditional GET before refetching.
+    ``landing`` keeps the whole visible body text instead of the readable content.
+    """
+    started = time.perf_counter()
+    key = normalize_url(url) + ("#landing" if landing else "")
+    entry = cache.get(key) if cache else None
+    if entry and entry.fresh:
+        return _from_cache(url, entry, "hit", started)
+
+    static = None
+    if HTTP_FIRST or (entry and entry.meta):
+        with span("http.fetch", conditional=bool(entry and entry.meta)):
+            static = await fetch_static_async(url, MIN_TEXT_LENGTH, entry.meta if entry else None)
+            annotate(status_code=static.status_code, not_modified=static.not_modified, js_only=static.js_only,
+                     bytes=len(static.body_text.encode("utf-8")), error=static.error)
+        if static.not_modified and entry:
+            cache.touch(key)
+            return _from_cache(url, entry, "revalidated", started)
+
+    if HTTP_FIRST and not needs_browser(static, MIN_TEXT_LENGTH, landing=landing):
+        result = PageResult(url=url, text=static.body_text if landing else static.text,
+                            links=static.links, tier="http")
+    else:
+        with span("browser.render"):
+            result = await render_with_browser(url, MAX_RETRIES, MIN_TEXT_LENGTH, landing=landing)
+            annotate(status=result.status, error=result.error)
+    result.elapsed = time.perf_counter() - started
+    if cache is not None:
+        result.cache = "miss"
+        if result.status == "ok":
+            value = {"text": result.text, "tier": result.tier, "links": result.links}
+            cache.set(key, value, static.validators if static else {})
+    return result
+
+
+async def render_with_browser(url: str, MAX_RETRIES: int = 3, MIN_TEXT_LENGTH: int =100,
+                              landing: bool = False) -> PageResult:
+    started = time.perf_counter()
+    last_error = None
+    links = []
+    async with get_browser_pool().page() as page:
         text_content = ""
 
-        for attempt in range(1, MAX_RETRIES + 1):
+        # The landing page only needs its raw body text and links, once
+        if landing:
+            try:
+                await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+                rendered = await page.evaluate(LANDING_SCRIPT)
+                text_content, links = rendered["text"], rendered["links"]
+            except Exception as e:
+                last_error = f"{type(e).__name__}: {e}"
+        attempts = 0 if landing else MAX_RETRIES
+
+        for attempt in range(1, attempts + 1):
             try:
                 await page.goto(url, wait_until="domcontentloaded", timeout=30000)
                 await page.wait_for_selector("body", timeout=10000)
 
                 # Extract content while excluding nav, footer, ads, etc.
-                text = await page.evaluate("""
+                rendered = await page.evaluate("""
                     () => {
+                        // Collect links before the navigation chrome is stripped
+                        const links = Array.from(document.querySelectorAll('a')).map(el => [el.href, el.innerText.trim()]);
+
                         const unwantedSelectors = [
                             'nav', 'footer', 'header', 'aside',
                             '.sidebar', '.advertisement', '.ads', '[role="banner"]',
@@ -45,14 +122,17 @@ async def scrape_single_url(url: str, OUTPUT_FILE: str = "page_text.txt", MAX_RE
                             'body p, body h1, body h2, body h3, body h4, body li, body blockquote'
                         );
 
-                        return Array.from(elements)
-                            .map(el => el.innerText.trim())
+                        // Skip containers of other matches (an li wrapping a p) so text isn't emitted twice
+                        const text = Array.from(elements)
+                            .filter(el => !el.querySelector('p, h1, h2, h3, h4, li, blockquote'))
+                            .map(el => el.innerText.replace(/\\s+/g, ' ').trim())
                             .filter(t => t.length > 0)
-                            .join("\\n\\n")
-                            .replace(/\\s+/g, ' ')
-                            .trim();
+                            .join("\\n\\n");
+                        return { text, links };
                     }
                 """)
+                text = rendered["text"]
+                links = rendered["links"]
 
                 if len(text) >= MIN_TEXT_LENGTH:
                     text_content = text
@@ -61,11 +141,12 @@ async def scrape_single_url(url: str, OUTPUT_FILE: str = "page_text.txt", MAX_RE
                     continue
                 
             except Exception as e:
+                last_error = f"{type(e).__name__}: {e}"
                 continue
-        await browser.close()
 
-        if text_content:
-            with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-                f.write(f"--- Content from {url} ---\n{text_content}\n\n")
-        else:
-            print("")
\ No newline at end of file
+    elapsed = time.perf_counter() - started
+    if text_content:
+        return PageResult(url=url, text=text_content, links=links, tier="browser", elapsed=elapsed)
+    if last_error:
+        return PageResult(url=url, status="error", tier="browser", elapsed=elapsed, error=last_error)
+    return PageResult(url=url, status="empty", links=links, tier="browser", elapsed=elapsed)
@@ -0,0 +1,22 @@
+import math
+import re
+
+WHITESPACE = re.compile(r"\s+")
+WORD = re.compile(r"\w+", re.UNICODE)
+
+# Rough average for English prose with Gemini/GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting and reporting, not billing."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially different copies compare equal."""
+    return WHITESPACE.sub(" ", text).strip().lower()
+
+
+def words(text: str) -> list:
+    return WORD.findall(text.lower())
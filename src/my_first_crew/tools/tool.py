@@ -1,7 +1,14 @@
+import asyncio
+import time
+from functools import partial
 import nest_asyncio
-import tldextract  
-from playwright.async_api import async_playwright
+import tldextract
+from my_first_crew.tools.cache import DiskCache
 from my_first_crew.tools.scrape_page import scrape_single_url
+from my_first_crew.tools.crawl_engine import CrawlEngine
+from my_first_crew.tools.crawl_result import CrawlResult
+from my_first_crew.tools.frontier import Frontier, url_locale
+from my_first_crew.tools.dedup import dedup_pages
 
 nest_asyncio.apply()
 
@@ -10,46 +17,39 @@ def extract_main_domain(url: str) -> str:
     extracted = tldextract.extract(url)
     return extracted.domain.lower()
 
-async def scrape_text_and_links(url):
-    target_domain = extract_main_domain(url)
+async def scrape_text_and_links(url, engine: CrawlEngine = None, cache: DiskCache = None,
+                                frontier: Frontier = None, dedup: bool = True) -> CrawlResult:
+    """Crawl ``url`` and its most relevant same-domain links, returning everything in memory.
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/116.0.0.0 Safari/537.36"
-            ),
-            viewport={"width": 1280, "height": 720},
-        )
-        page = await context.new_page()
-
-        await page.add_init_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => false});"
-        )
-
-        try:
-            await page.goto(url, wait_until='domcontentloaded', timeout=30000)
-            page_text = await page.evaluate("() => document.body.innerText")
-            links = await page.eval_on_selector_all(
-                "a",
-                """elements => elements.map(el => el.href)"""
-            )
-        except Exception as e:
-            await browser.close()
-            return
-        await browser.close()
-
-        # Clean links
-        links = [link for link in links if link and link.startswith("http")]
-
-        # Save page text
-        with open("page_text.txt", "w", encoding="utf-8") as f:
-            f.write(page_text)
-
-        # Separate matching & denied URLs
-        matching_links = [link for link in links if extract_main_domain(link) == target_domain]
-
-        for i, link in enumerate(matching_links, 1):
-            await scrape_single_url(link)
\ No newline at end of file
+    With ``dedup`` on, paragraphs repeated across pages (exactly or nearly) are
+    dropped so boilerplate is sent to the LLM only once.
+    """
+    target_domain = extract_main_domain(url)
+    started = time.perf_counter()
+    result = CrawlResult(start_url=url)
+
+    landing = await scrape_single_url(url, cache=cache, landing=True)
+    result.pages.append(landing)
+    if landing.status == "error":
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    # Rank same-domain links and crawl the best ones within the page/depth budget
+    if frontier is None:
+        frontier = Frontier()
+    frontier.accept = lambda link: extract_main_domain(link) == target_domain
+    frontier.locale = url_locale(url)
+    frontier.mark_seen(url)
+    frontier.add_all(landing.links, depth=1)
+
+    engine = engine or CrawlEngine(partial(scrape_single_url, cache=cache))
+    fetched = await engine.crawl(frontier)
+    result.pages.extend(fetched.values())
+
+    if dedup:
+        # Hashing every paragraph is CPU-bound; keep the shared browser-pool loop free for other crawls
+        stats = await asyncio.to_thread(dedup_pages, result.ok_pages)
+        result.dedup = stats.to_dict()
+
+    result.elapsed = time.perf_counter() - started
+    return result
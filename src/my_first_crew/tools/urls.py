@@ -0,0 +1,34 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_hsenc", "_hsmi", "hsctatracking", "ref", "ref_src", "referrer", "source", "trk",
+}
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+INDEX_PAGE = re.compile(r"/index\.(html?|php|aspx?)$", re.I)
+
+
+def normalize_url(url: str) -> str:
+    """Canonicalize a URL so equivalent spellings share one key.
+
+    Lowercases scheme and host, drops default ports, fragments, tracking query
+    parameters (``utm_*``, ``gclid`` ...), trailing slashes and ``index.html``,
+    and sorts the remaining query string. The result is still fetchable.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    path = INDEX_PAGE.sub("/", path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
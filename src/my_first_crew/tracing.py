@@ -0,0 +1,325 @@
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+TRACING = os.getenv("TRACING", "true").lower() in ("1", "true", "yes")
+TRACE_DIR = Path(os.getenv("TRACE_DIR", str(Path("output") / "traces")))
+# Spans kept per job (later ones are counted as dropped) and traces kept in memory
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "5000"))
+TRACE_MAX_JOBS = int(os.getenv("TRACE_MAX_JOBS", "50"))
+SERVICE_NAME = "competitor-research-crew"
+
+STATUS_OK, STATUS_ERROR = 1, 2
+SPAN_KIND_INTERNAL = 1
+
+
+@dataclass
+class Span:
+    """One timed step of a job: the job itself, a task, an agent iteration, an LLM or tool call, a page."""
+    trace: "Trace"
+    name: str
+    span_id: str
+    parent: Optional["Span"]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> "Span":
+        # Agent roles from the YAML config end in a newline
+        self.attributes.update({k: v.strip() if isinstance(v, str) else v
+                                for k, v in attributes.items() if v is not None})
+        return self
+
+    def end(self, error: Optional[str] = None, end_ns: Optional[int] = None):
+        if self.end_ns is not None:
+            return
+        self.error = error or self.error
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.finish(self)
+
+    def to_otlp(self, now_ns: Optional[int] = None) -> Dict[str, Any]:
+        attributes = dict(self.attributes)
+        if self.end_ns is None:
+            attributes["span.open"] = True
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or now_ns or time.time_ns()),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK},
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
+
+
+class Trace:
+    """All spans of one job. Spans may start and end on any thread."""
+
+    def __init__(self, job_id: str, max_spans: int = TRACE_MAX_SPANS):
+        self.job_id = job_id
+        self.trace_id = secrets.token_hex(16)
+        self.max_spans = max_spans
+        self.root: Optional[Span] = None
+        self.dropped = 0
+        self._finished: List[Span] = []
+        self._open: Dict[str, Span] = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str, parent: Optional[Span], start_ns: Optional[int] = None, **attributes: Any) -> Span:
+        span = Span(self, name, secrets.token_hex(8), parent, start_ns or time.time_ns())
+        span.set(**attributes)
+        with self._lock:
+            if len(self._finished) + len(self._open) >= self.max_spans:
+                self.dropped += 1
+                # Still returned, so callers can use it, but never exported
+                return span
+            self._open[span.span_id] = span
+        if parent is None:
+            self.root = span
+        return span
+
+    def finish(self, span: Span):
+        with self._lock:
+            if self._open.pop(span.span_id, None) is not None:
+                self._finished.append(span)
+
+    def close(self):
+        """End spans left open, e.g. by a task whose thread never reported back."""
+        with self._lock:
+            still_open = list(self._open.values())
+        for span in still_open:
+            if span is not self.root:
+                span.set(unfinished=True).end()
+        if self.root is not None:
+            self.root.set(dropped_spans=self.dropped or None).end()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The trace in the OpenTelemetry (OTLP/JSON) export format; open spans end now."""
+        now = time.time_ns()
+        with self._lock:
+            spans = self._finished + list(self._open.values())
+        spans.sort(key=lambda s: s.start_ns)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                {"key": "job.id", "value": {"stringValue": self.job_id}},
+            ]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [s.to_otlp(now) for s in spans]}],
+        }]}
+
+
+def trace_path(job_id: str, directory: Path = TRACE_DIR) -> Path:
+    return Path(directory) / (re.sub(r"[^\w.-]", "_", job_id) + ".json")
+
+
+class Tracer:
+    """Recent traces by job id; finished ones are also saved as JSON under ``TRACE_DIR``."""
+
+    def __init__(self, directory: Path = TRACE_DIR, max_jobs: int = TRACE_MAX_JOBS):
+        self.directory = Path(directory)
+        self.max_jobs = max_jobs
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, job_id: str) -> Trace:
+        trace = Trace(job_id)
+        with self._lock:
+            self._traces[job_id] = trace
+            self._traces.move_to_end(job_id)
+            while len(self._traces) > self.max_jobs:
+                self._traces.popitem(last=False)
+        return trace
+
+    def save(self, trace: Trace) -> Path:
+        path = trace_path(trace.job_id, self.directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(trace.to_otlp()), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def export(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's trace from memory (also while it runs) or from its saved file."""
+        with self._lock:
+            trace = self._traces.get(job_id)
+        if trace is not None:
+            return trace.to_otlp()
+        try:
+            return json.loads(trace_path(job_id, self.directory).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+
+TRACER = Tracer()
+
+# The innermost open span of the work running in the current thread or task
+current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+@contextmanager
+def trace_job(job_id: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Trace everything inside the block as one job, then save it to ``TRACE_DIR``."""
+    if not TRACING:
+        yield None
+        return
+    install_trace_listeners()
+    trace = TRACER.begin(job_id)
+    root = trace.start("job", None, job_id=job_id, **attributes)
+    token = current_span.set(root)
+    try:
+        yield root
+    except BaseException as exc:
+        root.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        current_span.reset(token)
+        trace.close()
+        try:
+            TRACER.save(trace)
+        except OSError as exc:
+            logging.warning(f"Could not save trace of job {job_id}: {exc}")
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """A child of the current span for the duration of the block; a no-op outside a traced job."""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.trace.start(name, parent, **attributes)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        current_span.reset(token)
+        child.end()
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """Open a child of the current span and make it current until ``end_span(name)``.
+
+    For steps whose start and end arrive as separate callbacks, such as CrewAI events.
+    """
+    parent = current_span.get()
+    if parent is None:
+        return None
+    child = parent.trace.start(name, parent, **attributes)
+    current_span.set(child)
+    return child
+
+
+def end_span(name: str, error: Optional[str] = None, **attributes: Any) -> Optional[Span]:
+    """End the innermost open ``name`` span of this context, and any span still open inside it."""
+    target = current_span.get()
+    while target is not None and target.name != name:
+        target = target.parent
+    if target is None:
+        return None
+    inner = current_span.get()
+    while inner is not target:
+        inner.end()
+        inner = inner.parent
+    target.set(**attributes).end(error)
+    current_span.set(target.parent)
+    return target
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes: Any) -> Optional[Span]:
+    """Add an already finished child of the current span."""
+    parent = current_span.get()
+    if parent is None:
+        return None
+    child = parent.trace.start(name, parent, start_ns=start_ns, **attributes)
+    child.end(end_ns=end_ns)
+    return child
+
+
+def annotate(**attributes: Any):
+    """Set attributes on the current span, if any."""
+    current = current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def next_iteration(**attributes: Any) -> Optional[Span]:
+    """Close the agent's previous ReAct iteration and open the next one inside the current task."""
+    current = current_span.get()
+    if current is not None and current.name == "agent.iteration":
+        current.end()
+        current_span.set(current.parent)
+    task = current_span.get()
+    if task is None or task.name != "task":
+        return None
+    task.attributes["iterations"] = task.attributes.get("iterations", 0) + 1
+    return start_span("agent.iteration", iteration=task.attributes["iterations"], **attributes)
+
+
+_listeners_installed = False
+
+
+def install_trace_listeners():
+    """Open and close task and tool spans from CrewAI's event bus."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    _listeners_installed = True
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+    from crewai.events.types.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent, ToolUsageStartedEvent
+
+    # Handlers run synchronously in the agent's thread, so spans opened here become that thread's current span
+    @crewai_event_bus.on(TaskStartedEvent)
+    def _task_started(source, event):
+        agent = getattr(event.task, "agent", None)
+        start_span("task", task=getattr(event.task, "name", None), agent=getattr(agent, "role", None))
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def _task_completed(source, event):
+        end_span("task")
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def _task_failed(source, event):
+        end_span("task", error=str(event.error))
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def _tool_started(source, event):
+        start_span("tool", tool=event.tool_name, agent=event.agent_role, task=event.task_name)
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _tool_finished(source, event):
+        end_span("tool", cache_hit=bool(event.from_cache), output_bytes=len(str(event.output or "").encode("utf-8")))
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _tool_failed(source, event):
+        end_span("tool", error=str(event.error))
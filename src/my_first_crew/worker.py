@@ -0,0 +1,52 @@
+"""Standalone job runner for servers started with ``JOB_RUNNER=worker``.
+
+The API only records queued jobs in the shared job store; each worker process
+claims them while it has idle threads and runs them exactly as the API would.
+"""
+import logging
+import os
+import time
+
+from my_first_crew.job_store import JOB_STORE
+from my_first_crew.server import SCHEDULER, STORE, WORKER_ID, JOB_CLEANUP_INTERVAL, run_pipeline, set_status
+
+# Seconds to wait before looking for new jobs when the queue is empty
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1"))
+
+
+def claim_jobs() -> int:
+    """Hand queued jobs to idle scheduler threads; returns how many were claimed."""
+    claimed = 0
+    while SCHEDULER.idle > 0:
+        job = STORE.claim_next(WORKER_ID)
+        if job is None:
+            break
+        # No client subscribes to events in a worker process, so its jobs do not stream text
+        if SCHEDULER.submit(job["job_id"], run_pipeline, job["job_id"], job["company"], False) is None:
+            set_status(job["job_id"], "error", "Rejected: worker queue is full")
+            break
+        claimed += 1
+    return claimed
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if JOB_STORE == "memory":
+        raise SystemExit("JOB_STORE=memory cannot be shared with the API; use the sqlite store")
+    print(f"👷 Worker {WORKER_ID} running {SCHEDULER.workers} job(s) at a time")
+    last_cleanup = 0.0
+    try:
+        while True:
+            if time.monotonic() - last_cleanup > JOB_CLEANUP_INTERVAL:
+                STORE.cleanup()
+                last_cleanup = time.monotonic()
+            if not claim_jobs():
+                time.sleep(WORKER_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        print(f"🛑 Worker {WORKER_ID} stopping")
+    finally:
+        SCHEDULER.shutdown()
+
+
+if __name__ == "__main__":
+    main()
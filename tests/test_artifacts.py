@@ -0,0 +1,32 @@
+import gzip
+import hashlib
+
+from my_first_crew.artifacts import ArtifactStore
+
+
+def test_versions_are_added_only_when_the_report_changes(tmp_path):
+    store = ArtifactStore(tmp_path)
+    first = store.put("Acme", b"# Acme\nv1", file="Acme_analysis.md", job_id="j1")
+    again = store.put("Acme", b"# Acme\nv1", file="Acme_analysis.md", job_id="j2")
+    second = store.put("Acme", b"# Acme\nv2", file="Acme_analysis.md", job_id="j3")
+
+    assert again == first
+    assert first.sha256 == hashlib.sha256(b"# Acme\nv1").hexdigest()
+    assert first.etag == f'"{first.sha256}"'
+    assert [v.job_id for v in store.versions("Acme")] == ["j3", "j1"]
+    assert store.latest_file("Acme_analysis.md") == second
+    assert store.get(first.sha256) == first
+
+
+def test_identical_content_is_stored_once_with_compressed_copies(tmp_path):
+    store = ArtifactStore(tmp_path)
+    report = tmp_path / "Acme_analysis.md"
+    report.write_bytes(b"# Same report\n" * 50)
+    acme = store.put("Acme", report)
+    globex = store.put("Globex", report.read_bytes(), file="Globex_analysis.md")
+
+    assert acme.sha256 == globex.sha256
+    assert acme.file == "Acme_analysis.md"
+    assert store.blob_path(acme.sha256).read_bytes() == report.read_bytes()
+    assert gzip.decompress(store.blob_path(acme.sha256, "gzip").read_bytes()) == report.read_bytes()
+    assert "gzip" in store.encodings()
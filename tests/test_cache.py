@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from my_first_crew.tools import cache as cache_module
+from my_first_crew.tools.cache import DiskCache, SingleFlight
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_entries_go_stale_after_ttl_until_touched(tmp_path, clock):
+    cache = DiskCache(tmp_path / "c.sqlite", ttl=60)
+    cache.set("k", {"v": 1}, meta={"etag": "abc"})
+
+    clock[0] += 30
+    entry = cache.get("k")
+    assert (entry.value, entry.meta, entry.fresh) == ({"v": 1}, {"etag": "abc"}, True)
+
+    clock[0] += 31
+    assert cache.get("k").fresh is False
+    cache.touch("k")
+    assert cache.get("k").fresh is True
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_limit(tmp_path, clock):
+    value = "x" * 100
+    entry_size = len(f'"{value}"') + len("{}")
+    cache = DiskCache(tmp_path / "c.sqlite", max_bytes=3 * entry_size)
+    for key in ("a", "b", "c"):
+        clock[0] += 1
+        cache.set(key, value)
+    clock[0] += 1
+    cache.get("a")
+
+    clock[0] += 1
+    cache.set("d", value)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+    assert cache.stats()["bytes"] == 3 * entry_size
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flight.shared < 3:
+        threading.Event().wait(0.005)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert (len(calls), results, flight.shared) == (1, ["value"] * 4, 3)
+    # Once finished, the next call computes afresh
+    assert flight.do("k", lambda: "new") == "new"
+
+
+def test_single_flight_raises_the_error_and_forgets_the_call():
+    flight = SingleFlight()
+
+    def boom():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", boom)
+    assert flight.do("k", lambda: "recovered") == "recovered"
@@ -0,0 +1,58 @@
+from my_first_crew.tools.compress import Chunk, bm25_scores, chunk_page, compress_pages
+from my_first_crew.tools.crawl_result import PageResult
+from my_first_crew.tools.text import estimate_tokens
+
+
+def paragraph(topic: str, n: int = 12) -> str:
+    return " ".join([topic] * n)
+
+
+def test_chunks_hold_whole_paragraphs_within_the_size():
+    page = PageResult(url="https://x.com/", text="\n".join(paragraph(f"word{i}", 10) for i in range(6)))
+    chunks = chunk_page(page, chunk_tokens=40)
+
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    assert all(c.tokens <= 40 + 5 for c in chunks)
+    assert "\n\n".join(c.text for c in chunks).split("\n\n") == [p for p in page.text.split("\n")]
+
+
+def test_bm25_prefers_chunks_about_the_query_and_ignores_stopwords():
+    chunks = [Chunk("u", 0, "pricing plans for enterprise customers", 6),
+              Chunk("u", 1, "our history and the team", 6),
+              Chunk("u", 2, "pricing", 2)]
+    scores = bm25_scores(chunks, "the pricing plans")
+    assert scores[1] == 0
+    assert scores[0] > scores[2] > 0
+    assert bm25_scores(chunks, "the and of") == [0.0, 0.0, 0.0]
+
+
+def test_budget_keeps_the_most_relevant_chunks_in_page_order():
+    about = PageResult(url="https://x.com/about", text=paragraph("history") + "\n" + paragraph("pricing"), tier="http")
+    products = PageResult(url="https://x.com/products", text=paragraph("products"), tier="browser")
+    budget = estimate_tokens(paragraph("pricing")) + estimate_tokens(paragraph("products"))
+
+    out = compress_pages([about, products], "products pricing", token_budget=budget, chunk_tokens=10)
+
+    assert [c.text for c in out.kept] == [paragraph("pricing"), paragraph("products")]
+    assert [c.text for c in out.dropped] == [paragraph("history")]
+    assert out.kept_tokens <= budget
+    assert out.text.index("https://x.com/about [http]") < out.text.index("https://x.com/products [browser]")
+    assert "history" not in out.text.split("--- Omitted")[0]
+    assert "- https://x.com/about: 1 chunk(s)" in out.text
+
+
+def test_a_chunk_too_big_for_what_is_left_does_not_stop_smaller_ones():
+    page = PageResult(url="https://x.com/", text=paragraph("pricing", 40) + "\n" + paragraph("products", 5))
+    big, small = chunk_page(page, chunk_tokens=10)
+
+    out = compress_pages([page], "pricing products", token_budget=small.tokens + 1, chunk_tokens=10)
+
+    assert [c.text for c in out.kept] == [small.text]
+    assert [c.text for c in out.dropped] == [big.text]
+
+
+def test_everything_fits_without_a_manifest():
+    page = PageResult(url="https://x.com/", text=paragraph("products"))
+    out = compress_pages([page], "products", token_budget=10_000)
+    assert out.dropped == []
+    assert "Omitted" not in out.text
@@ -0,0 +1,49 @@
+import asyncio
+import random
+
+from my_first_crew.tools.crawl_engine import CrawlEngine
+from my_first_crew.tools.crawl_result import PageResult
+from my_first_crew.tools.frontier import Frontier
+
+LINKS = {
+    "https://x.com/products": [["https://x.com/products/cloud", "Cloud"], ["https://x.com/products/edge", "Edge"]],
+    "https://x.com/pricing": [["https://x.com/plans", "Plans"]],
+}
+
+
+def crawl(seed: int, max_pages: int = 10) -> dict:
+    rng = random.Random(seed)
+
+    async def fetch(url):
+        # Pages finish in a different order on every seed
+        await asyncio.sleep(rng.random() / 100)
+        return PageResult(url=url, text=f"text of {url}", links=LINKS.get(url, []))
+
+    frontier = Frontier(max_pages=max_pages, max_depth=2)
+    frontier.add_all([("https://x.com/blog", "Blog"), ("https://x.com/products", "Products"),
+                      ("https://x.com/pricing", "Pricing"), ("https://x.com/about", "About")])
+    engine = CrawlEngine(fetch, max_concurrency=4, per_host=4, time_budget=10, target_chars=0)
+    return asyncio.run(engine.crawl(frontier))
+
+
+def test_pages_come_back_by_depth_then_relevance_whatever_finished_first():
+    orders = {tuple(crawl(seed)) for seed in range(5)}
+    assert len(orders) == 1
+    order = orders.pop()
+    assert order[:2] == ("https://x.com/products", "https://x.com/pricing")
+    assert set(order[4:]) == {"https://x.com/products/cloud", "https://x.com/products/edge", "https://x.com/plans"}
+
+
+def test_page_budget_limits_fetches():
+    assert len(crawl(seed=1, max_pages=3)) == 3
+
+
+def test_failed_fetch_is_reported_not_raised():
+    async def fetch(url):
+        raise ConnectionError("refused")
+
+    frontier = Frontier()
+    frontier.add("https://x.com/products")
+    pages = asyncio.run(CrawlEngine(fetch).crawl(frontier))
+    assert pages["https://x.com/products"].status == "error"
+    assert "ConnectionError" in pages["https://x.com/products"].error
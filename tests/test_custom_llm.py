@@ -0,0 +1,18 @@
+import copy
+
+from my_first_crew.custom_llm import Gemini
+
+
+def test_config_memo_survives_type_conversion():
+    llm = Gemini(model="gemini-2.5-flash", api_key="test")
+    tools = [{"name": "search", "description": "Search the web",
+              "parameters": {"type": "object", "properties": {"query": {"type": "str"}, "urls": {"type": "list[str]"}}}}]
+    declared = copy.deepcopy(tools)
+
+    first = llm._to_config(tools, None, "You are a researcher")
+    second = llm._to_config(tools, None, "You are a researcher")
+
+    assert tools == declared
+    assert second is first
+    properties = first.tools[0].function_declarations[0].parameters.properties
+    assert (properties["query"].type, properties["urls"].type) == ("STRING", "ARRAY")
@@ -0,0 +1,47 @@
+from my_first_crew.tools.crawl_result import PageResult
+from my_first_crew.tools.dedup import MAX_HAMMING_DISTANCE, ParagraphDeduplicator, dedup_pages, simhash
+from my_first_crew.tools.text import words
+
+FOOTER = "Acme builds cloud data platforms for retail, logistics and finance teams across Europe and North America."
+EDITED = "Acme builds cloud data platforms for retail, logistics and banking teams across Europe and North America."
+OTHER = "Our quarterly earnings call covered revenue growth, hiring plans and the new office opening in Singapore."
+
+
+def distance(a: str, b: str) -> int:
+    return bin(simhash(words(a)) ^ simhash(words(b))).count("1")
+
+
+def test_simhash_keeps_one_word_edits_close_and_unrelated_text_apart():
+    assert simhash(words(FOOTER)) == simhash(words(FOOTER.upper()))
+    assert distance(FOOTER, EDITED) <= MAX_HAMMING_DISTANCE
+    assert distance(FOOTER, OTHER) > MAX_HAMMING_DISTANCE
+
+
+def test_exact_and_near_repeats_are_rejected():
+    dedup = ParagraphDeduplicator()
+    assert not dedup.is_duplicate(FOOTER)
+    assert dedup.is_duplicate("  " + FOOTER.lower().replace(" ", "   ") + " ")
+    assert dedup.is_duplicate(EDITED)
+    assert not dedup.is_duplicate(OTHER)
+    assert (dedup.stats.exact_removed, dedup.stats.near_removed) == (1, 1)
+
+
+def test_short_paragraphs_only_match_exactly():
+    dedup = ParagraphDeduplicator()
+    assert not dedup.is_duplicate("Contact sales today")
+    assert not dedup.is_duplicate("Contact support today")
+    assert dedup.is_duplicate("contact sales today")
+
+
+def test_dedup_pages_keeps_first_occurrence_and_raw_text():
+    first = PageResult(url="https://x.com/", text=f"Welcome to Acme.\n{FOOTER}")
+    second = PageResult(url="https://x.com/products", text=f"Acme Cloud runs your warehouse.\n\n{EDITED}")
+
+    stats = dedup_pages([first, second])
+
+    assert first.text == f"Welcome to Acme.\n{FOOTER}"
+    assert second.text == "Acme Cloud runs your warehouse."
+    assert second.raw_text == f"Acme Cloud runs your warehouse.\n\n{EDITED}"
+    assert stats.paragraphs == 4
+    assert stats.near_removed == 1
+    assert stats.bytes_removed == len(EDITED.encode("utf-8"))
@@ -0,0 +1,61 @@
+from my_first_crew.tools.frontier import Frontier, is_locale_variant, score_link, url_locale
+
+
+def test_product_pages_outrank_generic_ones():
+    assert score_link("https://x.com/products") > score_link("https://x.com/blog")
+    assert score_link("https://x.com/a", anchor="Pricing plans") > score_link("https://x.com/a", anchor="Read more")
+
+
+def test_deeper_links_and_longer_paths_score_lower():
+    assert score_link("https://x.com/products", depth=1) > score_link("https://x.com/products", depth=2)
+    assert score_link("https://x.com/products") > score_link("https://x.com/products/a/b/c")
+
+
+def test_login_legal_and_binary_links_are_dropped():
+    for url in ("https://x.com/login", "https://x.com/legal/terms", "https://x.com/careers",
+                "https://x.com/brochure.pdf", "https://x.com/logo.PNG"):
+        assert score_link(url) is None, url
+
+
+def test_locale_is_read_from_path_prefix_or_query():
+    assert url_locale("https://x.com/de/produkte") == "de"
+    assert url_locale("https://x.com/pt_BR/produtos") == "pt"
+    assert url_locale("https://x.com/a?lang=fr") == "fr"
+    assert url_locale("https://x.com/en-us/products") is None
+    assert url_locale("https://x.com/a?hl=en") is None
+    assert url_locale("https://x.com/products") is None
+    # Two-letter segments that are not language codes are ordinary paths
+    assert url_locale("https://x.com/ai/models") is None
+
+
+def test_other_locales_are_variants_but_the_start_locale_is_not():
+    assert is_locale_variant("https://x.com/de/produkte")
+    assert not is_locale_variant("https://x.com/de/produkte", locale="de")
+    assert is_locale_variant("https://x.com/fr/produits", locale="de")
+    assert not is_locale_variant("https://x.com/products", locale="de")
+
+
+def test_crawl_started_on_a_localized_site_keeps_its_own_pages():
+    frontier = Frontier(locale="de")
+    added = frontier.add_all(["https://x.com/de/produkte", "https://x.com/de/preise", "https://x.com/fr/produits"])
+    assert added == 2
+    assert frontier.dropped == 1
+
+
+def test_pop_returns_most_relevant_first_and_respects_page_budget():
+    frontier = Frontier(max_pages=2)
+    frontier.add_all([("https://x.com/blog", "Blog"), ("https://x.com/products", "Products"),
+                      ("https://x.com/pricing", "Pricing")])
+    assert [frontier.pop().url for _ in range(2)] == ["https://x.com/products", "https://x.com/pricing"]
+    assert frontier.pop() is None
+    assert len(frontier) == 1
+
+
+def test_duplicates_depth_and_accept_filter():
+    frontier = Frontier(max_depth=1, accept=lambda url: "x.com" in url)
+    assert frontier.add("https://x.com/products")
+    assert not frontier.add("https://X.com/products/?utm_source=nav#top")
+    assert not frontier.add("https://x.com/features", depth=2)
+    assert not frontier.add("https://other.com/products")
+    assert not frontier.add("mailto:sales@x.com")
+    assert len(frontier) == 1
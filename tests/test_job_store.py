@@ -0,0 +1,72 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from my_first_crew import job_store
+from my_first_crew.job_store import MemoryJobStore, SQLiteJobStore, dedup_key
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def stores(request, tmp_path):
+    """Stores seen by the concurrent callers: one shared store, or one SQLite connection each."""
+    if request.param == "memory":
+        store = MemoryJobStore()
+        return [store] * 8
+    return [SQLiteJobStore(tmp_path / "jobs.sqlite") for _ in range(8)]
+
+
+def test_concurrent_find_or_create_creates_one_job(stores, monkeypatch):
+    # A slow clock widens any gap between the lookup and the insert
+    clock = time.time
+    monkeypatch.setattr(job_store.time, "time", lambda: time.sleep(0.01) or clock())
+    key = dedup_key("Acme")
+    barrier = threading.Barrier(len(stores))
+    results = []
+
+    def request(store):
+        barrier.wait()
+        results.append(store.find_or_create(uuid.uuid4().hex, "Acme", key, message="Queued for Acme"))
+
+    threads = [threading.Thread(target=request, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(created for _, created in results) == 1
+    assert len({job["job_id"] for job, _ in results}) == 1
+    assert stores[0].count("queued") == 1
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_touched_job_is_not_failed_as_stale(kind, tmp_path, monkeypatch):
+    store = MemoryJobStore() if kind == "memory" else SQLiteJobStore(tmp_path / "jobs.sqlite")
+    for job_id in ("alive", "silent"):
+        store.create(job_id, "Acme", claimed_by="worker-1")
+        store.update(job_id, "researching")
+
+    clock = time.time
+    monkeypatch.setattr(job_store.time, "time", lambda: clock() + 120)
+    store.touch("alive")
+    store.cleanup(stale_after=60)
+
+    assert store.get("alive")["stage"] == "researching"
+    assert store.get("silent")["stage"] == "error"
+    assert [e["stage"] for e in store.history("silent")] == ["queued", "researching", "error"]
+    assert [e["stage"] for e in store.history("alive")] == ["queued", "researching"]
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_full_queue_still_returns_existing_job(kind, tmp_path):
+    store = MemoryJobStore() if kind == "memory" else SQLiteJobStore(tmp_path / "jobs.sqlite")
+    queued, _ = store.find_or_create("first", "Acme", dedup_key("Acme"), max_queued=1)
+
+    job, created = store.find_or_create("second", "Acme", dedup_key("Acme"), max_queued=1)
+    assert (job["job_id"], created) == (queued["job_id"], False)
+
+    job, created = store.find_or_create("third", "Globex", dedup_key("Globex"), max_queued=1)
+    assert (job, created) == (None, False)
+    assert store.get("third") is None
+    assert store.count("queued") == 1
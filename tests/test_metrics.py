@@ -0,0 +1,13 @@
+from my_first_crew.metrics import Metrics, tagged
+
+
+def test_agent_role_is_stripped_in_labels():
+    metrics = Metrics()
+    with tagged(agent="Senior Research Analyst\n", task="crawl_task"):
+        metrics.record_tool_call("fast_web_crawler", 0.2, 100)
+    metrics.record_llm_call("gemini", 1.0, agent="Senior Research Analyst\n")
+
+    text = metrics.render()
+    assert 'crew_tool_calls_total{agent="Senior Research Analyst",outcome="ok",task="crawl_task",tool="fast_web_crawler"} 1' in text
+    assert 'crew_llm_calls_total{agent="Senior Research Analyst",cache="miss",model="gemini"} 1' in text
+    assert "\\n" not in text
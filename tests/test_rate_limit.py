@@ -0,0 +1,109 @@
+import pytest
+
+from my_first_crew import rate_limit
+from my_first_crew.rate_limit import RateLimiter, TokenBucket, call_with_retry, is_retryable, retry_after_seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limit.time, "sleep", lambda seconds: now.__setitem__(0, now[0] + seconds))
+    return now
+
+
+def test_bucket_allows_a_burst_then_spaces_callers_out(clock):
+    bucket = TokenBucket(per_minute=60, burst_seconds=5)
+    assert [bucket.reserve(1, clock[0]) for _ in range(5)] == [0.0] * 5
+    assert [bucket.reserve(1, clock[0]) for _ in range(3)] == [1.0, 2.0, 3.0]
+    # Four seconds later the debt of three tokens is paid off and one more is available
+    assert bucket.reserve(1, clock[0] + 4) == 0.0
+    assert bucket.reserve(1, clock[0] + 4) == pytest.approx(1.0)
+
+
+def test_bucket_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(per_minute=60, burst_seconds=2)
+    bucket.reserve(2, clock[0])
+    assert bucket.reserve(1, clock[0] + 3600) == 0.0
+    assert bucket.tokens == pytest.approx(1.0)
+
+
+def test_limiter_waits_for_the_slowest_of_request_and_token_quotas(clock):
+    limiter = RateLimiter("test", rpm=600, tpm=6000)
+    assert limiter.reserve(tokens=1000) == 0.0
+    # The token bucket (100/s, 1000 burst) is empty; 500 more tokens need five seconds
+    assert limiter.reserve(tokens=500) == pytest.approx(5.0)
+    assert limiter.waited == pytest.approx(5.0)
+
+
+def test_settle_refunds_overestimated_tokens(clock):
+    limiter = RateLimiter("test", tpm=600)
+    limiter.reserve(tokens=100)
+    assert limiter.reserve(tokens=10) == pytest.approx(1.0)
+    limiter.settle(estimated=110, actual=20)
+    assert limiter.reserve(tokens=10) == 0.0
+
+
+def test_retry_after_pauses_every_caller(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda low, high: 0.0)
+    limiter = RateLimiter("test")
+    assert limiter.backoff(HTTPError(429, {"Retry-After": "7"}), attempt=0) == 0.0
+    assert limiter.reserve() == pytest.approx(7.0)
+    assert limiter.retries == 1
+
+
+def test_retry_after_is_read_from_headers_or_gemini_details():
+    assert retry_after_seconds(HTTPError(429, {"retry-after": "3"})) == 3.0
+    gemini = Exception("quota")
+    gemini.details = {"error": {"details": [{"@type": "RetryInfo", "retryDelay": "12s"}]}}
+    assert retry_after_seconds(gemini) == 12.0
+    assert retry_after_seconds(HTTPError(429)) is None
+
+
+def test_only_transient_errors_are_retryable():
+    assert is_retryable(HTTPError(429))
+    assert is_retryable(HTTPError(503))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(HTTPError(400))
+    assert not is_retryable(ValueError("bad input"))
+
+
+def test_call_with_retry_retries_transient_errors_only(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda low, high: high)
+    attempts = []
+
+    def flaky():
+        attempts.append(clock[0])
+        if len(attempts) < 3:
+            raise HTTPError(503)
+        return "ok"
+
+    assert call_with_retry(RateLimiter("test"), flaky, max_retries=3) == "ok"
+    # Full-jitter backoff capped at base * 2 ** attempt: one second, then two
+    assert [b - a for a, b in zip(attempts, attempts[1:])] == [1.0, 2.0]
+
+
+
+@pytest.mark.parametrize("status, max_retries, expected_calls", [(400, 3, 1), (429, 2, 3)])
+def test_call_with_retry_gives_up(clock, status, max_retries, expected_calls):
+    calls = []
+
+    def failing():
+        calls.append(clock[0])
+        raise HTTPError(status)
+
+    with pytest.raises(HTTPError):
+        call_with_retry(RateLimiter("test"), failing, max_retries=max_retries)
+    assert len(calls) == expected_calls
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from my_first_crew.metrics import METRICS
+from my_first_crew.tools import custom_tool
+from my_first_crew.tools.cache import DiskCache, SingleFlight
+from my_first_crew.tools.custom_tool import FlexibleSerperDevTool
+
+
+def search_counts() -> dict:
+    return {dict(key)["cache"]: value for key, value in METRICS.searches.values.items()}
+
+
+@pytest.fixture
+def tool(tmp_path, monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "test")
+    cache = DiskCache(tmp_path / "search.sqlite", ttl=60)
+    monkeypatch.setattr(custom_tool, "get_search_cache", lambda: cache)
+    monkeypatch.setattr(custom_tool, "_search_flight", SingleFlight())
+    monkeypatch.setattr(METRICS.searches, "values", {})
+    return FlexibleSerperDevTool()
+
+
+def test_repeated_query_is_counted_as_hit(tool, monkeypatch):
+    calls = []
+    monkeypatch.setattr(FlexibleSerperDevTool, "_search", lambda self, q: calls.append(q) or {"organic": [q]})
+
+    assert tool._lookup("Acme products") == {"organic": ["Acme products"]}
+    assert tool._lookup("  acme PRODUCTS?") == {"organic": ["Acme products"]}
+
+    assert calls == ["Acme products"]
+    assert search_counts() == {"miss": 1, "hit": 1}
+    assert 'crew_search_requests_total{cache="hit"} 1' in METRICS.render()
+
+
+def test_concurrent_identical_queries_are_counted_as_coalesced(tool, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def slow_search(self, query):
+        calls.append(query)
+        release.wait(5)
+        return {"organic": [query]}
+
+    monkeypatch.setattr(FlexibleSerperDevTool, "_search", slow_search)
+    threads = [threading.Thread(target=tool._lookup, args=("Acme pricing",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    # Let every follower join the leader's request before it returns
+    while custom_tool._search_flight.shared < 3:
+        threading.Event().wait(0.005)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert search_counts() == {"miss": 1, "coalesced": 3}
+
+
+def test_uncached_searches_are_counted_as_off(tool, monkeypatch):
+    monkeypatch.setattr(FlexibleSerperDevTool, "_search", lambda self, q: {"organic": []})
+    tool.use_cache = False
+    tool._lookup("Acme")
+    tool._lookup("Acme")
+    assert search_counts() == {"off": 2}
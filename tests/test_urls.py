@@ -0,0 +1,32 @@
+import pytest
+
+from my_first_crew.tools.urls import normalize_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://Example.COM/Products/", "https://example.com/Products"),
+    ("https://example.com:443/a", "https://example.com/a"),
+    ("http://example.com:80/a", "http://example.com/a"),
+    ("https://example.com:8443/a", "https://example.com:8443/a"),
+    ("https://example.com/a#pricing", "https://example.com/a"),
+    ("https://example.com//docs///api/", "https://example.com/docs/api"),
+    ("https://example.com/about/index.html", "https://example.com/about"),
+    ("https://example.com/index.php", "https://example.com/"),
+    ("https://example.com", "https://example.com/"),
+])
+def test_equivalent_spellings_share_one_key(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_tracking_parameters_are_dropped_and_the_rest_sorted():
+    url = "https://example.com/p?utm_source=x&b=2&gclid=abc&a=1&UTM_Campaign=y&ref=home"
+    assert normalize_url(url) == "https://example.com/p?a=1&b=2"
+
+
+def test_meaningful_query_and_blank_values_are_kept():
+    assert normalize_url("https://example.com/search?q=gpu&page=") == "https://example.com/search?page=&q=gpu"
+
+
+def test_normalizing_twice_changes_nothing():
+    once = normalize_url(" https://Example.com/a/b/?z=1&utm_medium=m&y=2#top ")
+    assert normalize_url(once) == once